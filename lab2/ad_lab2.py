@@ -1,11 +1,34 @@
 import os
-import urllib.request
+import re
+import argparse
+import hashlib
+import json
+import http.client
+import itertools
+import tempfile
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from datetime import datetime
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 
 # === Глобальні змінні ===
 BASE_URL = "https://www.star.nesdis.noaa.gov/smcd/emb/vci/VH/get_TS_admin.php"
 DATA_DIR = "data"
+REGION_IDS = range(1, 26)
+MAX_WORKERS = 8
+RETRIES = 3
+BACKOFF = 1.0
+TIMEOUT = 60
+MAX_REDIRECTS = 5
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+PARALLEL_MIN_FILES = 64
+CACHE_FILE = "final_vhi_data.parquet"
+NOAA_FILE_RE = re.compile(r"NOAA_ID(\d+)(?:_\d+)?\.csv$")
 
 # === 1. Створення директорії ===
 def create_data_directory():
@@ -13,54 +36,358 @@ def create_data_directory():
         os.makedirs(DATA_DIR)
 
 # === 2. Завантаження даних по області ===
-def download_vhi_data(region_id):
+# Кожен потік тримає власні з'єднання (по одному на хост), тому повторні запити
+# до NOAA не відкривають нове TCP/TLS-з'єднання.
+_local = threading.local()
+
+def build_url(region_id, year1=1981, year2=2024, base_url=BASE_URL):
+    return f"{base_url}?country=UKR&provinceID={region_id}&year1={year1}&year2={year2}&type=Mean"
+
+def _get_connection(parts):
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    key = (parts.scheme, parts.netloc)
+    if key not in connections:
+        conn_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+        connections[key] = conn_class(parts.netloc, timeout=TIMEOUT)
+    return connections[key]
+
+def _drop_connection(parts):
+    connections = getattr(_local, "connections", {})
+    conn = connections.pop((parts.scheme, parts.netloc), None)
+    if conn is not None:
+        conn.close()
+
+def _get(url, max_redirects=MAX_REDIRECTS):
+    # Як і urlopen, переходимо за Location (переїзд сервісу, http → https); кожен хост
+    # обслуговується своїм постійним з'єднанням. Якщо переходів забагато, повертаємо
+    # останню відповідь 3xx — fetch_url сприйме її як помилку без повторів
+    for _ in range(max_redirects + 1):
+        parts = urllib.parse.urlsplit(url)
+        try:
+            conn = _get_connection(parts)
+            conn.request("GET", parts.path + (f"?{parts.query}" if parts.query else ""))
+            response = conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            _drop_connection(parts)
+            raise
+        location = response.getheader("Location")
+        if response.status not in REDIRECT_STATUSES or not location:
+            break
+        url = urllib.parse.urljoin(url, location)
+    return response, data
+
+def fetch_url(url, retries=RETRIES, backoff=BACKOFF):
+    for attempt in range(retries + 1):
+        try:
+            response, data = _get(url)
+        except (OSError, http.client.HTTPException) as e:
+            error = e
+        else:
+            if response.status == 200:
+                return data
+            # 3xx (забагато переходів) і 4xx повторювати немає сенсу, 5xx — тимчасова помилка сервера
+            error = IOError(f"HTTP {response.status} {response.reason}")
+            if response.status < 500:
+                raise error
+
+        if attempt < retries:
+            time.sleep(backoff * 2 ** attempt)
+
+    raise error
+
+def write_atomic(filepath, writer):
+    # Пишемо у тимчасовий файл у тій самій директорії і лише потім перейменовуємо,
+    # щоб перерваний запис не залишав напівзаписаних файлів; унікальне ім'я від
+    # mkstemp не дає двом процесам (CLI і Streamlit) писати в один тимчасовий файл
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(filepath) or ".", suffix=".part")
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            writer(file)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+def save_atomic(filepath, data):
+    write_atomic(filepath, lambda file: file.write(data))
+
+def download_vhi_data(region_id, base_url=BASE_URL, retries=RETRIES, backoff=BACKOFF):
     now = datetime.now().strftime("%d%m%Y%H%M%S")
     filename = f"NOAA_ID{region_id}_{now}.csv"
     filepath = os.path.join(DATA_DIR, filename)
 
     if not os.path.exists(filepath):
-        url = f"{BASE_URL}?country=UKR&provinceID={region_id}&year1=1981&year2=2024&type=Mean"
+        url = build_url(region_id, base_url=base_url)
         try:
-            with urllib.request.urlopen(url) as response:
-                data = response.read()
-
-            with open(filepath, 'wb') as file:
-                file.write(data)
+            data = fetch_url(url, retries=retries, backoff=backoff)
+            save_atomic(filepath, data)
 
             print(f"[OK] Дані для області {region_id} збережено як {filename}")
+            return filepath
         except Exception as e:
             print(f"[ERR] Помилка при завантаженні для області {region_id}: {e}")
     else:
         print(f"[INFO] Файл для області {region_id} вже існує: {filename}. Пропущено завантаження.")
+    return None
 
-# === 3. Зчитування всіх CSV у один DataFrame ===
-def read_all_data(directory):
-    headers = ['Year', 'Week', 'SMN', 'SMT', 'VCI', 'TCI', 'VHI', 'empty']
-    all_frames = []
+def region_id_from_filename(file):
+    match = NOAA_FILE_RE.match(file)
+    return int(match.group(1)) if match else None
 
+def downloaded_regions(directory):
+    regions = set()
     for file in os.listdir(directory):
-        if file.startswith("NOAA_ID") and file.endswith('.csv'):
-            try:
-                df = pd.read_csv(os.path.join(directory, file), header=1, names=headers)
+        region_id = region_id_from_filename(file)
+        if region_id is not None:
+            regions.add(region_id)
+    return regions
+
+def _run_for_regions(task, region_ids, max_workers, *args):
+    results = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(task, i, *args): i for i in region_ids}
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+    return results
+
+def _report_failures(results, start):
+    failed = sorted(i for i, path in results.items() if path is None)
+    print(f"[INFO] Завантаження завершено за {time.perf_counter() - start:.2f} сек")
+    if failed:
+        print(f"[ERR] Не вдалося завантажити області: {failed}")
+
+# === 2.1 Паралельне завантаження всіх областей ===
+def download_all_vhi_data(region_ids=REGION_IDS, max_workers=MAX_WORKERS, base_url=BASE_URL,
+                          retries=RETRIES, backoff=BACKOFF):
+    # Докачка: області, для яких уже є повний файл, повторно не завантажуються
+    done = downloaded_regions(DATA_DIR)
+    pending = [i for i in region_ids if i not in done]
+    if not pending:
+        print("Файли з даними вже існують. Пропущено завантаження.")
+        return {}
+
+    print(f"Завантаження даних для {len(pending)} областей ({max_workers} потоків)...")
+    start = time.perf_counter()
+    results = _run_for_regions(download_vhi_data, pending, max_workers, base_url, retries, backoff)
+    _report_failures(results, start)
+    return results
+
+# === 2.2 Інкрементальна синхронізація ===
+# Для кожної області зберігається один канонічний файл NOAA_ID{n}.csv у форматі NOAA.
+# Останній валідний (Year, Week) береться з нього, тож з NOAA запитуються лише роки,
+# починаючи з року цього тижня (він міг бути неповним на момент попереднього оновлення).
+def canonical_filename(region_id):
+    return f"NOAA_ID{region_id}.csv"
+
+def split_noaa_text(text):
+    title, header, rows = "", "", {}
+    for line in text.splitlines():
+        line = line.replace("<tt><pre>", "").replace("</pre></tt>", "").strip()
+        if not line:
+            continue
+        fields = line.split(",")
+        try:
+            key = (int(fields[0]), int(fields[1]))
+        except (ValueError, IndexError):
+            if not title:
+                title = line
+            elif not header:
+                header = line
+            continue
+        rows[key] = line
+    return title, header, rows
+
+def format_noaa_text(title, header, rows):
+    keys = sorted(rows)
+    body = [rows[key] for key in keys]
+    if body:
+        title = re.sub(r"(from \d+ to )\d+", rf"\g<1>{keys[-1][0]}", title)
+        body[0] = "<tt><pre>" + body[0]
+    return "\n".join([title, header] + body + ["</pre></tt>"]) + "\n"
+
+def last_valid_week(rows):
+    valid = [key for key, line in rows.items() if float(line.split(",")[6]) != -1]
+    return max(valid) if valid else None
+
+def sync_vhi_data(region_id, base_url=BASE_URL, retries=RETRIES, backoff=BACKOFF, year_end=None):
+    year_end = year_end or datetime.now().year
+    canonical = canonical_filename(region_id)
+
+    # Зливаємо канонічний файл і старі NOAA_ID{n}_<час>.csv (новіші мають пріоритет)
+    files = sorted((f for f in os.listdir(DATA_DIR) if region_id_from_filename(f) == region_id),
+                   key=lambda f: os.path.getmtime(os.path.join(DATA_DIR, f)))
+    title, header, rows = "", "", {}
+    for file in files:
+        with open(os.path.join(DATA_DIR, file), encoding="utf-8", errors="replace") as f:
+            file_title, file_header, file_rows = split_noaa_text(f.read())
+        title, header = title or file_title, header or file_header
+        rows.update(file_rows)
+
+    last = last_valid_week(rows)
+    year_start = last[0] if last else 1981
+    try:
+        data = fetch_url(build_url(region_id, year_start, year_end, base_url), retries, backoff)
+    except Exception as e:
+        print(f"[ERR] Помилка при оновленні області {region_id}: {e}")
+        return None
 
-                df = df[pd.to_numeric(df['Year'], errors='coerce').notnull()]
-                df['Year'] = df['Year'].astype(int)
+    new_title, new_header, new_rows = split_noaa_text(data.decode("utf-8", errors="replace"))
+    if not new_rows and not rows:
+        print(f"[ERR] NOAA не повернув даних для області {region_id}")
+        return None
 
-                df = df[df['VHI'] != -1]
+    updated = sum(1 for key, line in new_rows.items() if rows.get(key) != line)
+    rows.update(new_rows)
+    filepath = os.path.join(DATA_DIR, canonical)
+    save_atomic(filepath, format_noaa_text(title or new_title, header or new_header, rows).encode("utf-8"))
 
-                region_id = int(file.split("ID")[1].split("_")[0])
-                df['filename'] = file
-                df['area'] = region_id
-                all_frames.append(df)
-            except Exception as e:
-                print(f"[WARN] Пропущено файл {file}: {e}")
+    # Дублікати більше не потрібні — усе вже в канонічному файлі
+    for file in files:
+        if file != canonical:
+            os.remove(os.path.join(DATA_DIR, file))
 
-    if all_frames:
-        return pd.concat(all_frames, ignore_index=True)
+    print(f"[OK] Область {region_id}: запитано {year_start}–{year_end}, нових/змінених тижнів: {updated}")
+    return filepath
+
+def sync_all_vhi_data(region_ids=REGION_IDS, max_workers=MAX_WORKERS, base_url=BASE_URL,
+                      retries=RETRIES, backoff=BACKOFF, year_end=None):
+    print(f"Інкрементальне оновлення {len(region_ids)} областей ({max_workers} потоків)...")
+    start = time.perf_counter()
+    results = _run_for_regions(sync_vhi_data, region_ids, max_workers, base_url, retries, backoff, year_end)
+    _report_failures(results, start)
+    return results
+
+# === 3. Зчитування всіх CSV у один DataFrame ===
+# Файли NOAA — це HTML-обгортка навколо CSV: рядок-заголовок з назвою області,
+# шапка з <br>, <tt><pre> перед першим рядком даних і </pre></tt> наприкінці.
+# Парсер знімає розмітку і декодує числа одразу в типізовані NumPy-колонки.
+INDEX_COLUMNS = ['SMN', 'SMT', 'VCI', 'TCI', 'VHI']
+NOAA_TITLE_RE = re.compile(r"Province=\s*(\d+):\s*([^,]*)")
+
+def parse_noaa_file(path):
+    with open(path, encoding="utf-8", errors="replace") as file:
+        title = file.readline()
+        file.readline()  # шапка year,week, SMN,...<br>
+        first_row = file.readline().replace("<tt><pre>", "")
+
+        match = NOAA_TITLE_RE.search(title)
+        if match is None:
+            raise ValueError("не знайдено рядок 'Province=' у заголовку")
+
+        # Решту файлу читаємо потоково; рядок із </pre></tt> відкидається як коментар
+        values = np.loadtxt(itertools.chain([first_row], file), delimiter=",",
+                            usecols=range(7), comments="<", ndmin=2)
+
+    columns = {
+        'area': int(match.group(1)),
+        'province': match.group(2).strip(),
+        'Year': values[:, 0].astype(np.int16),
+        'Week': values[:, 1].astype(np.int16),
+    }
+    for i, name in enumerate(INDEX_COLUMNS, start=2):
+        columns[name] = values[:, i].astype(np.float32)
+    return columns
+
+def _parse_valid_rows(path):
+    # Виконується у процесі-воркері: повертає лише валідні рядки (VHI != -1),
+    # щоб між процесами передавались компактні масиви
+    try:
+        columns = parse_noaa_file(path)
+    except Exception as e:
+        return path, None, str(e)
+    valid = columns['VHI'] != -1
+    for name in ['Year', 'Week'] + INDEX_COLUMNS:
+        columns[name] = columns[name][valid]
+    return path, columns, None
+
+def print_progress(done, total, path, error):
+    # progress-колбек для CLI: лічильник файлів в одному рядку і помилки окремими рядками
+    # (без колбека read_all_data мовчить — помилки все одно лежать у df.attrs['errors'])
+    if error is not None:
+        print(f"\r[WARN] Пропущено файл {os.path.basename(path)}: {error}")
+    print(f"\rПрочитано файлів: {done}/{total}", end="\n" if done == total else "", flush=True)
+
+def read_all_data(directory, workers=None, progress=None):
+    paths = [os.path.join(directory, f) for f in sorted(os.listdir(directory))
+             if region_id_from_filename(f) is not None]
+    if workers is None:
+        workers = 1 if len(paths) < PARALLEL_MIN_FILES else os.cpu_count()
+
+    parsed, errors = [], []
+    if workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(_parse_valid_rows, paths, chunksize=max(1, len(paths) // (workers * 4)))
     else:
+        executor = None
+        results = map(_parse_valid_rows, paths)
+    try:
+        for done, (path, columns, error) in enumerate(results, start=1):
+            if error is None:
+                parsed.append(columns)
+            else:
+                errors.append({'file': os.path.basename(path), 'error': error})
+            if progress is not None:
+                progress(done, len(paths), path, error)
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+    if not parsed:
         print("[ERR] Жоден файл не був прочитаний!")
         return pd.DataFrame()
 
+    # Одна конкатенація у заздалегідь виділені масиви замість pd.concat по списку DataFrame
+    total = sum(len(p['Year']) for p in parsed)
+    data = {name: np.empty(total, dtype=parsed[0][name].dtype) for name in ['Year', 'Week'] + INDEX_COLUMNS}
+    data['area'] = np.empty(total, dtype=np.int16)
+    # Назва провінції з заголовка NOAA — одна на файл, тож зберігаємо коди категорій
+    provinces = sorted({p['province'] for p in parsed})
+    province_codes = np.empty(total, dtype=np.int16)
+    offset = 0
+    for p in parsed:
+        end = offset + len(p['Year'])
+        for name in ['Year', 'Week'] + INDEX_COLUMNS:
+            data[name][offset:end] = p[name]
+        data['area'][offset:end] = p['area']
+        province_codes[offset:end] = provinces.index(p['province'])
+        offset = end
+
+    data['province'] = pd.Categorical.from_codes(province_codes, provinces)
+    df = pd.DataFrame(data)
+    df.attrs['errors'] = errors
+    return df
+
+# === 3.1 Порівняння з універсальним pd.read_csv ===
+def read_all_data_pandas(directory):
+    headers = ['Year', 'Week', 'SMN', 'SMT', 'VCI', 'TCI', 'VHI', 'empty']
+    all_frames = []
+
+    for file in os.listdir(directory):
+        region_id = region_id_from_filename(file)
+        if region_id is not None:
+            df = pd.read_csv(os.path.join(directory, file), header=1, names=headers)
+            df = df[pd.to_numeric(df['Year'], errors='coerce').notnull()]
+            df['Year'] = df['Year'].astype(int)
+            df = df[df['VHI'] != -1]
+            df['area'] = region_id
+            all_frames.append(df)
+
+    return pd.concat(all_frames, ignore_index=True)
+
+def benchmark_parsers(directory, repeats=5):
+    for name, reader in [("pd.read_csv", read_all_data_pandas), ("parse_noaa_file", read_all_data)]:
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            df = reader(directory)
+            timings.append(time.perf_counter() - start)
+        memory = df.memory_usage(deep=True).sum() / 2**20
+        print(f"{name:>16}: мін. {min(timings) * 1000:7.1f} мс, медіана {np.median(timings) * 1000:7.1f} мс, "
+              f"{len(df)} рядків, {memory:.2f} МБ")
+
 # === 4. Перейменування індексів областей ===
 def rename_areas(df):
     index_map = {
@@ -71,58 +398,510 @@ def rename_areas(df):
         19: 'Харківська', 20: 'Херсонська', 21: 'Хмельницька', 22: 'Черкаська',
         23: 'Чернівецька', 24: 'Чернігівська', 25: 'Крим'
     }
-    df['region_name'] = df['area'].replace(index_map)
+    df['region_name'] = df['area'].replace(index_map).astype('category')
     return df
 
-# === 5. Функції вибірки та аналізу ===
-def get_vhi_by_year(df, region, year):
-    result = df[(df['region_name'] == region) & (df['Year'] == year)][['Week', 'VHI']]
+# === 4.1 Колонковий кеш для Streamlit (лаба 3) ===
+# Оброблені дані зберігаються у Parquet (категорійні region_name і province, int16/float32),
+# а в метаданих файлу — хеш вмісту вихідних NOAA_ID*.csv. Якщо файли змінилися,
+# кеш перебудовується автоматично.
+CACHE_SCHEMA = "2"  # змінюється разом зі складом колонок, щоб старі кеші перебудувались
+
+def source_hash(directory):
+    digest = hashlib.sha256(CACHE_SCHEMA.encode())
+    for file in sorted(os.listdir(directory)):
+        if region_id_from_filename(file) is not None:
+            digest.update(file.encode("utf-8"))
+            with open(os.path.join(directory, file), 'rb') as f:
+                digest.update(hashlib.sha256(f.read()).digest())
+    return digest.hexdigest()
+
+def cached_hash(path):
+    try:
+        metadata = pq.read_schema(path).metadata or {}
+    except (OSError, pa.ArrowException):
+        return None
+    return metadata.get(b"source_hash", b"").decode() or None
+
+def save_cache(df, path, digest):
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    table = table.replace_schema_metadata({**table.schema.metadata, b"source_hash": digest.encode()})
+    write_atomic(path, lambda file: pq.write_table(table, file))
+
+def load_vhi_data(directory=DATA_DIR, columns=None, workers=None, progress=None, digest=None):
+    # digest можна передати готовим, щоб не хешувати всі NOAA_ID* повторно (див. load_vhi_cube)
+    path = os.path.join(directory, CACHE_FILE)
+    digest = digest or source_hash(directory)
+
+    if cached_hash(path) == digest:
+        return pd.read_parquet(path, columns=columns)
+
+    print("[INFO] Кеш відсутній або застарів — перебудова з файлів NOAA_ID*...")
+    df = rename_areas(read_all_data(directory, workers, progress))
+    if not df.empty:
+        save_cache(df, path, digest)
+    return df[columns] if columns else df
+
+# === 4.2 Агрегатний куб VHI/VCI/TCI ===
+# Щільний масив значень область × індекс × рік × тиждень, над яким один раз будуються
+# двовимірні префіксні суми (рік, тиждень) для сум і кількостей, а також розріджені
+# таблиці мінімумів/максимумів по тижнях кожного року. Сума, кількість і середнє за
+# будь-який прямокутник «роки × тижні» — чотири звернення до префіксних сум,
+# екстремуми — два звернення на кожен рік діапазону.
+CUBE_FILE = "vhi_cube.npz"
+WEEKS = 52
+
+class VHICube:
+    def __init__(self, regions, years, values):
+        self.regions = list(regions)
+        self.years = np.asarray(years)
+        self.values = values
+        self.sums = self.counts = self.mins = self.maxs = None
+        self._build_aggregates(0)
+
+    @classmethod
+    def from_frame(cls, df):
+        regions = sorted(df['region_name'].astype(str).unique())
+        years = np.arange(df['Year'].min(), df['Year'].max() + 1)
+        values = np.full((len(regions), len(INDEX_COLUMNS), len(years), WEEKS), np.nan, dtype=np.float32)
+        cls._fill(values, regions, years, df)
+        return cls(regions, years, values)
+
+    @staticmethod
+    def _fill(values, regions, years, df):
+        r = pd.Categorical(df['region_name'].astype(str), categories=regions).codes
+        y = df['Year'].to_numpy() - years[0]
+        w = df['Week'].to_numpy() - 1
+        values[r, :, y, w] = df[INDEX_COLUMNS].to_numpy(dtype=np.float32)
+
+    def _build_aggregates(self, start):
+        # Перераховуються лише роки, починаючи з start; префікси до нього не змінюються
+        R, I, Y, W = self.values.shape
+        if self.sums is None or self.sums.shape[2] != Y + 1:
+            sums = np.zeros((R, I, Y + 1, W + 1))
+            counts = np.zeros((R, I, Y + 1, W + 1), dtype=np.int32)
+            if self.sums is not None:
+                sums[:, :, :start + 1] = self.sums[:, :, :start + 1]
+                counts[:, :, :start + 1] = self.counts[:, :, :start + 1]
+            self.sums, self.counts = sums, counts
+
+        block = self.values[:, :, start:]
+        present = ~np.isnan(block)
+        row_sums = np.where(present, block, 0).cumsum(axis=3, dtype=np.float64)
+        row_counts = present.cumsum(axis=3, dtype=np.int32)
+        self.sums[:, :, start + 1:, 1:] = self.sums[:, :, start:start + 1, 1:] + row_sums.cumsum(axis=2)
+        self.counts[:, :, start + 1:, 1:] = self.counts[:, :, start:start + 1, 1:] + row_counts.cumsum(axis=2)
+
+        # Розріджені таблиці: рівень k містить мін/макс по 2^k тижнях, починаючи з кожного
+        if start == 0 or self.mins[0].shape[2] != Y:
+            self.mins = [np.where(np.isnan(self.values), np.inf, self.values)]
+            self.maxs = [np.where(np.isnan(self.values), -np.inf, self.values)]
+            for k in range(1, int(np.log2(W)) + 1):
+                half = 2 ** (k - 1)
+                self.mins.append(np.minimum(self.mins[-1][..., :-half], self.mins[-1][..., half:]))
+                self.maxs.append(np.maximum(self.maxs[-1][..., :-half], self.maxs[-1][..., half:]))
+        else:
+            self.mins[0][:, :, start:] = np.where(present, block, np.inf)
+            self.maxs[0][:, :, start:] = np.where(present, block, -np.inf)
+            for k in range(1, len(self.mins)):
+                half = 2 ** (k - 1)
+                prev_min, prev_max = self.mins[k - 1][:, :, start:], self.maxs[k - 1][:, :, start:]
+                self.mins[k][:, :, start:] = np.minimum(prev_min[..., :-half], prev_min[..., half:])
+                self.maxs[k][:, :, start:] = np.maximum(prev_max[..., :-half], prev_max[..., half:])
+
+    def query(self, indicator, year_range, week_range):
+        i = INDEX_COLUMNS.index(indicator)
+        a = max(year_range[0] - self.years[0], 0)
+        b = min(year_range[1] - self.years[0], len(self.years) - 1)
+        w1, w2 = max(week_range[0], 1), min(week_range[1], WEEKS)
+        result = pd.DataFrame(index=pd.Index(self.regions, name='region_name'))
+        if a > b or w1 > w2:
+            result['sum'], result['count'] = 0.0, 0
+            result['mean'] = result['min'] = result['max'] = np.nan
+            return result
+
+        def rectangle(prefix):
+            p = prefix[:, i]
+            return p[:, b + 1, w2] - p[:, a, w2] - p[:, b + 1, w1 - 1] + p[:, a, w1 - 1]
+
+        k = int(np.log2(w2 - w1 + 1))
+        mins = np.minimum(self.mins[k][:, i, a:b + 1, w1 - 1], self.mins[k][:, i, a:b + 1, w2 - 2 ** k]).min(axis=1)
+        maxs = np.maximum(self.maxs[k][:, i, a:b + 1, w1 - 1], self.maxs[k][:, i, a:b + 1, w2 - 2 ** k]).max(axis=1)
+
+        result['sum'] = rectangle(self.sums)
+        result['count'] = rectangle(self.counts)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            result['mean'] = result['sum'] / result['count']
+        result['min'] = np.where(np.isinf(mins), np.nan, mins)
+        result['max'] = np.where(np.isinf(maxs), np.nan, maxs)
+        return result
+
+    def block(self, regions, indicators, year_range, week_range):
+        # Щільний зріз області × індекси × роки × тижні без фільтрації таблиці
+        r = [self.regions.index(name) for name in regions]
+        i = [INDEX_COLUMNS.index(name) for name in indicators]
+        a = max(year_range[0] - self.years[0], 0)
+        b = min(year_range[1] - self.years[0], len(self.years) - 1)
+        w1, w2 = max(week_range[0], 1), min(week_range[1], WEEKS)
+        values = self.values[np.ix_(r, i, np.arange(a, b + 1), np.arange(w1 - 1, w2))]
+        return values, self.years[a:b + 1], np.arange(w1, w2 + 1)
+
+    def update(self, df):
+        # Дозаписує нові/змінені тижні і перераховує агрегати лише від найранішого зміненого року
+        if df.empty:
+            return
+        if not set(df['region_name'].astype(str)) <= set(self.regions):
+            raise ValueError("нові області — потрібна повна перебудова куба")
+        if df['Year'].min() < self.years[0]:
+            raise ValueError("дані раніше першого року куба — потрібна повна перебудова")
+
+        last_year = df['Year'].max()
+        if last_year > self.years[-1]:
+            extra = np.full(self.values.shape[:2] + (last_year - self.years[-1], WEEKS), np.nan, dtype=np.float32)
+            self.values = np.concatenate([self.values, extra], axis=2)
+            self.years = np.arange(self.years[0], last_year + 1)
+
+        self._fill(self.values, self.regions, self.years, df)
+        self._build_aggregates(int(df['Year'].min() - self.years[0]))
+
+    def save(self, path, digest):
+        write_atomic(path, lambda f: np.savez(f, regions=np.array(self.regions), years=self.years,
+                                              values=self.values, source_hash=np.array(digest)))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(data['regions'].tolist(), data['years'], data['values']), str(data['source_hash'])
+
+def load_vhi_cube(directory=DATA_DIR, df=None, digest=None):
+    path = os.path.join(directory, CUBE_FILE)
+    digest = digest or source_hash(directory)
+    cube, cached = None, None
+    if os.path.exists(path):
+        try:
+            cube, cached = VHICube.load(path)
+        except (OSError, KeyError, ValueError):
+            cube = None
+    if cube is not None and cached == digest:
+        return cube
+
+    if df is None:
+        df = load_vhi_data(directory, digest=digest)
+
+    # Після --sync змінюються лише тижні, починаючи з останнього року куба; якщо решта
+    # даних збігається (ті самі області та кількість рядків до цього року) — оновлюємо
+    # куб інкрементально, інакше будуємо заново
+    if cube is not None:
+        last = len(cube.years) - 1
+        earlier_rows = cube.counts[:, INDEX_COLUMNS.index('VHI'), last, WEEKS].sum()
+        same_regions = sorted(df['region_name'].astype(str).unique()) == cube.regions
+        if same_regions and earlier_rows == (df['Year'] < cube.years[-1]).sum():
+            cube.update(df[df['Year'] >= cube.years[-1]])
+        else:
+            cube = None
+    if cube is None:
+        cube = VHICube.from_frame(df)
+
+    cube.save(path, digest)
+    return cube
+
+# === 5. Індекс для вибірок по області та роках ===
+# Таблиця один раз сортується за (area, Year, Week); кожна область — це суцільний
+# діапазон рядків, а роки всередині нього відсортовані, тож будь-яка вибірка
+# «область + роки» — це два бінарні пошуки і зріз без перегляду всієї таблиці.
+class VHIIndex:
+    def __init__(self, df):
+        order = np.lexsort((df['Week'].to_numpy(), df['Year'].to_numpy(), df['area'].to_numpy()))
+        self.df = df.iloc[order].reset_index(drop=True)
+        self.years = self.df['Year'].to_numpy()
+        self.arrays = {name: self.df[name].to_numpy() for name in ['Week'] + INDEX_COLUMNS if name in self.df}
+
+        areas, starts = np.unique(self.df['area'].to_numpy(), return_index=True)
+        ends = np.append(starts[1:], len(self.df))
+        names = self.df['region_name'].to_numpy()[starts]
+        self.slices = {name: (start, end) for name, start, end in zip(names, starts, ends)}
+
+    def bounds(self, region, year_start, year_end):
+        if region not in self.slices:
+            return 0, 0
+        start, end = self.slices[region]
+        years = self.years[start:end]
+        lo = start + np.searchsorted(years, year_start, side='left')
+        hi = start + np.searchsorted(years, year_end, side='right')
+        return lo, hi
+
+    def select(self, region, year_start, year_end):
+        lo, hi = self.bounds(region, year_start, year_end)
+        return self.df.iloc[lo:hi]
+
+# === 5.1 Функції вибірки та аналізу ===
+def get_vhi_by_year(index, region, year):
+    result = index.select(region, year, year)[['Week', 'VHI']]
     print(f"\nVHI для області {region} за рік {year}:\n", result)
     return result
 
-def vhi_statistics(df, region, year):
-    filtered = df[(df['region_name'] == region) & (df['Year'] == year)]['VHI']
+def vhi_stats(index, region, year_start, year_end, indicator='VHI', cube=None):
+    # Кількість, мінімум, максимум і середнє — з куба за сталий час; медіану з префіксних
+    # сум не отримати, тож її рахуємо по зрізу індексу
+    lo, hi = index.bounds(region, year_start, year_end)
+    values = index.arrays[indicator][lo:hi].astype(np.float64)
+    if not len(values):
+        return {'count': 0, 'min': None, 'max': None, 'mean': None, 'median': None}
+    if cube is not None and region in cube.regions:
+        row = cube.query(indicator, (year_start, year_end), (1, WEEKS)).loc[region]
+        count, low, high, mean = int(row['count']), row['min'], row['max'], row['mean']
+    else:
+        count, low, high, mean = len(values), values.min(), values.max(), values.mean()
+    return {'count': count, 'min': round(float(low), 2), 'max': round(float(high), 2),
+            'mean': round(float(mean), 2), 'median': round(float(np.median(values)), 2)}
+
+def vhi_statistics(index, region, year, cube=None):
+    stats = vhi_stats(index, region, year, year, cube=cube)
     print(f"\nСтатистика VHI для {region} у {year} році:")
-    print(f"  Мінімум: {filtered.min()}")
-    print(f"  Максимум: {filtered.max()}")
-    print(f"  Середнє: {filtered.mean():.2f}")
-    print(f"  Медіана: {filtered.median()}")
+    if not stats['count']:
+        print("  Немає даних")
+        return stats
+    print(f"  Мінімум: {stats['min']:.2f}")
+    print(f"  Максимум: {stats['max']:.2f}")
+    print(f"  Середнє: {stats['mean']:.2f}")
+    print(f"  Медіана: {stats['median']:.2f}")
+    return stats
 
-def get_vhi_range(df, region, year_start, year_end):
-    result = df[(df['region_name'] == region) & (df['Year'].between(year_start, year_end))][['Year', 'Week', 'VHI']]
+def get_vhi_range(index, region, year_start, year_end):
+    result = index.select(region, year_start, year_end)[['Year', 'Week', 'VHI']]
     print(f"\nVHI для області {region} з {year_start} по {year_end}:\n", result)
     return result
 
+# === 5.2 Аналіз посух ===
+# Кожен тиждень класифікується за VHI (< 15 — екстремальна посуха, < 35 — помірна),
+# після чого одне групування по (Year, область) дає кількість тижнів кожного класу,
+# а з нього — кількість і перелік областей по роках без повторної фільтрації.
+EXTREME_DROUGHT = 15
+MODERATE_DROUGHT = 35
+
+def drought_analysis(df, extreme=EXTREME_DROUGHT, moderate=MODERATE_DROUGHT, min_regions=5):
+    vhi = df['VHI'].to_numpy()
+    severity = np.where(vhi < extreme, 2, np.where(vhi < moderate, 1, 0))
+    in_drought = severity > 0
+
+    weeks = (
+        df.loc[in_drought, ['Year', 'region_name']]
+        .assign(severity=severity[in_drought])
+        .groupby(['Year', 'region_name', 'severity'], observed=True).size()
+        .unstack('severity', fill_value=0)
+        .reindex(columns=[1, 2], fill_value=0)
+    )
+    by_year = weeks.groupby(level='Year')
+    extreme_regions = weeks[2] > 0
+
+    result = pd.DataFrame({
+        'extreme_regions': extreme_regions.groupby(level='Year').sum(),
+        'moderate_regions': (weeks[1] > 0).groupby(level='Year').sum(),
+        'extreme_weeks': by_year[2].sum(),
+        'moderate_weeks': by_year[1].sum(),
+    })
+    names = weeks.index[extreme_regions.to_numpy()]
+    region_lists = (pd.Series(names.get_level_values('region_name').astype(str))
+                    .groupby(names.get_level_values('Year')).agg(list))
+    result['regions'] = [region_lists.get(year, []) for year in result.index]
+    result['critical'] = result['extreme_regions'] >= min_regions
+    return result
+
 def detect_droughts(df, min_regions=5):
-    droughts = df[df['VHI'] < 15]
-    drought_years = droughts.groupby('Year')['region_name'].nunique()
-    critical_years = drought_years[drought_years >= min_regions]
+    result = drought_analysis(df, min_regions=min_regions)
+    critical = result[result['critical']]
 
     print(f"\nРоки з екстремальною посухою (областей >= {min_regions}):")
-    for year in critical_years.index:
-        regions = droughts[droughts['Year'] == year]['region_name'].unique()
-        print(f"  {year}: {len(regions)} областей -> {', '.join(regions)}")
+    for year, row in critical.iterrows():
+        print(f"  {year}: {row['extreme_regions']} областей, {row['extreme_weeks']} тижнів -> "
+              f"{', '.join(row['regions'])}")
+    return critical
+
+# === 5.3 Порівняння індексу з булевими масками ===
+def replicate_dataset(df, copies):
+    # Імітація багатьох країн: кожна копія отримує власні номери та назви областей
+    frames = []
+    for k in range(copies):
+        part = df.copy()
+        part['area'] = (part['area'].astype(np.int32) + k * 1000)
+        part['region_name'] = part['region_name'].astype(str) + f"#{k}"
+        frames.append(part)
+    result = pd.concat(frames, ignore_index=True)
+    result['region_name'] = result['region_name'].astype('category')
+    return result
+
+def benchmark_queries(df, scales=(1, 10, 100), n_queries=200, seed=0):
+    rng = np.random.default_rng(seed)
+    for copies in scales:
+        big = replicate_dataset(df, copies)
+        regions = rng.choice(big['region_name'].cat.categories.to_numpy(), n_queries)
+        years = rng.integers(big['Year'].min(), big['Year'].max() + 1, n_queries)
+
+        start = time.perf_counter()
+        for region, year in zip(regions, years):
+            big[(big['region_name'] == region) & (big['Year'] == year)]
+        mask_time = (time.perf_counter() - start) / n_queries
+
+        start = time.perf_counter()
+        index = VHIIndex(big)
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for region, year in zip(regions, years):
+            index.select(region, year, year)
+        index_time = (time.perf_counter() - start) / n_queries
+
+        print(f"{len(big):>9} рядків: маска {mask_time * 1e6:9.1f} мкс/запит, "
+              f"індекс {index_time * 1e6:7.1f} мкс/запит (побудова {build_time * 1000:.1f} мс)")
+
+# === 6. Пакетний режим ===
+# Файл запитів (CSV, JSON або JSON Lines) з полями action, region, year_start, year_end
+# (та необов'язковими indicator, min_regions) виконується над одним завантаженим
+# набором даних; результати пишуться у JSON або CSV.
+#   action: by_year | range — тижневі значення, stats — мін/макс/середнє/медіана,
+#           droughts — роки з екстремальною посухою в діапазоні років
+BATCH_ACTIONS = ('by_year', 'range', 'stats', 'droughts')
+
+def read_queries(path):
+    if path.endswith('.csv'):
+        queries = pd.read_csv(path).to_dict('records')
+        return [{key: value for key, value in q.items() if not pd.isna(value)} for q in queries]
+    with open(path, encoding="utf-8") as f:
+        if path.endswith('.json'):
+            return json.load(f)
+        return [json.loads(line) for line in f if line.strip()]
+
+def _query_value(query, key, default=None):
+    value = query.get(key, default)
+    return default if value is None or (isinstance(value, float) and np.isnan(value)) else value
+
+def run_query(query, index, droughts_by_limit, df, cube=None):
+    action = query.get('action')
+    region = _query_value(query, 'region')
+    year_start = int(_query_value(query, 'year_start', index.years.min()))
+    year_end = int(_query_value(query, 'year_end', year_start if action == 'by_year' else index.years.max()))
+    indicator = _query_value(query, 'indicator', 'VHI')
+
+    if action not in BATCH_ACTIONS:
+        raise ValueError(f"невідома дія '{action}'")
+    if indicator not in INDEX_COLUMNS:
+        raise ValueError(f"невідомий індекс '{indicator}'")
+    if action != 'droughts' and region not in index.slices:
+        raise ValueError(f"невідома область '{region}'")
+
+    if action in ('by_year', 'range'):
+        lo, hi = index.bounds(region, year_start, year_end)
+        values = np.round(index.arrays[indicator][lo:hi].astype(np.float64), 2).tolist()
+        return [{'Year': year, 'Week': week, indicator: value} for year, week, value
+                in zip(index.years[lo:hi].tolist(), index.arrays['Week'][lo:hi].tolist(), values)]
+    if action == 'stats':
+        return [vhi_stats(index, region, year_start, year_end, indicator, cube)]
+
+    min_regions = int(_query_value(query, 'min_regions', 5))
+    if min_regions not in droughts_by_limit:
+        droughts_by_limit[min_regions] = drought_analysis(df, min_regions=min_regions)
+    result = droughts_by_limit[min_regions]
+    critical = result[result['critical']].loc[year_start:year_end]
+    return [{'Year': year, 'regions_count': int(row['extreme_regions']), 'drought_weeks': int(row['extreme_weeks']),
+             'regions': row['regions']} for year, row in critical.iterrows()]
+
+def write_results(results, path):
+    if path.endswith('.csv'):
+        rows = []
+        for query_id, item in enumerate(results):
+            query = {key: value for key, value in item.items() if key not in ('result', 'error')}
+            if 'error' in item:
+                rows.append({'query_id': query_id, **query, 'error': item['error']})
+            for record in item.get('result', []):
+                record = {k: ', '.join(v) if isinstance(v, list) else v for k, v in record.items()}
+                rows.append({'query_id': query_id, **query, **record})
+        pd.DataFrame(rows).to_csv(path, index=False)
+    else:
+        with open(path, 'w', encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False,
+                      default=lambda o: o.item() if hasattr(o, 'item') else str(o))
+
+def run_batch(df, queries_path, output_path, index=None, cube=None):
+    if index is None:
+        index = VHIIndex(df)
+    queries = read_queries(queries_path)
+    droughts_by_limit = {}
+    results = []
+    failed = 0
+
+    start = time.perf_counter()
+    for query in queries:
+        item = dict(query)
+        try:
+            item['result'] = run_query(query, index, droughts_by_limit, df, cube)
+        except (ValueError, TypeError, KeyError) as e:
+            item['error'] = str(e)
+            failed += 1
+        results.append(item)
+    elapsed = time.perf_counter() - start
+
+    write_results(results, output_path)
+    print(f"[OK] Виконано {len(queries)} запитів за {elapsed:.3f} сек "
+          f"({failed} з помилками), результати збережено у {output_path}")
+    return results
 
 # === MAIN ===
+def parse_args():
+    parser = argparse.ArgumentParser(description="Завантаження та аналіз VHI-даних NOAA")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS,
+                        help="кількість паралельних завантажень")
+    parser.add_argument("--parse-workers", type=int,
+                        help="кількість процесів для розбору файлів NOAA_ID* (1 — без пулу; "
+                             f"за замовчуванням пул вмикається від {PARALLEL_MIN_FILES} файлів)")
+    parser.add_argument("--retries", type=int, default=RETRIES,
+                        help="кількість повторних спроб для кожної області")
+    parser.add_argument("--base-url", default=BASE_URL,
+                        help="адреса сервісу NOAA (або локальної заглушки)")
+    parser.add_argument("--sync", action="store_true",
+                        help="інкрементально дозавантажити нові тижні в канонічні файли NOAA_ID{n}.csv")
+    parser.add_argument("--bench-parse", action="store_true",
+                        help="порівняти швидкість парсера NOAA з pd.read_csv і вийти")
+    parser.add_argument("--bench-query", action="store_true",
+                        help="порівняти вибірки через індекс і через булеві маски і вийти")
+    parser.add_argument("--batch", metavar="QUERIES",
+                        help="виконати запити з файлу (CSV/JSON/JSONL) без інтерактивного меню")
+    parser.add_argument("--output", default="vhi_results.json",
+                        help="файл результатів пакетного режиму (.json або .csv)")
+    parser.add_argument("--no-download", action="store_true",
+                        help="не звертатися до NOAA, працювати з наявними файлами")
+    return parser.parse_args()
+
 if __name__ == "__main__":
+    args = parse_args()
     create_data_directory()
 
-    # Перевіряємо, чи є вже файли в директорії
-    existing_files = [f for f in os.listdir(DATA_DIR) if f.startswith("NOAA_ID") and f.endswith('.csv')]
+    if args.bench_parse:
+        benchmark_parsers(DATA_DIR)
+        raise SystemExit
 
-    if not existing_files:
-        print("Завантаження даних для всіх областей...")
-        for i in range(1, 26):
-            download_vhi_data(i)
-    else:
-        print("Файли з даними вже існують. Пропущено завантаження.")
+    if args.sync:
+        sync_all_vhi_data(max_workers=args.workers, base_url=args.base_url, retries=args.retries)
+    elif not args.no_download:
+        # Завантажуємо лише ті області, для яких ще немає файлів
+        download_all_vhi_data(max_workers=args.workers, base_url=args.base_url, retries=args.retries)
 
+    # Обробляємо файли і зберігаємо кеш для Streamlit (лаба 3); якщо файли
+    # не змінилися з минулого запуску, дані просто читаються з кешу
     print("\nОбробка збережених файлів...")
-    df = read_all_data(DATA_DIR)
-    df = rename_areas(df)
+    digest = source_hash(DATA_DIR)
+    df = load_vhi_data(DATA_DIR, workers=args.parse_workers, progress=print_progress, digest=digest)
+
+    if args.bench_query:
+        benchmark_queries(df)
+        raise SystemExit
+
+    # Індекс — для вибірок рядків і медіани, куб — для count/min/max/mean
+    index = VHIIndex(df)
+    cube = load_vhi_cube(DATA_DIR, df, digest)
 
-    # Зберігаємо оброблені дані для Streamlit (лаба 3)
-    df.to_csv("data/final_vhi_data.csv", index=False)
+    if args.batch:
+        run_batch(df, args.batch, args.output, index, cube)
+        raise SystemExit
 
     while True:
         print("\n--- Виберіть дію ---")
@@ -137,18 +916,18 @@ if __name__ == "__main__":
         if choice == "1":
             region = input("Введіть назву області (наприклад, Київська): ")
             year = int(input("Введіть рік: "))
-            get_vhi_by_year(df, region, year)
+            get_vhi_by_year(index, region, year)
 
         elif choice == "2":
             region = input("Введіть назву області: ")
             year = int(input("Введіть рік: "))
-            vhi_statistics(df, region, year)
+            vhi_statistics(index, region, year, cube)
 
         elif choice == "3":
             region = input("Введіть назву області: ")
             year_start = int(input("Початковий рік: "))
             year_end = int(input("Кінцевий рік: "))
-            get_vhi_range(df, region, year_start, year_end)
+            get_vhi_range(index, region, year_start, year_end)
 
         elif choice == "4":
             print("Аналізуємо роки, коли посуха охопила 5 або більше областей...")
@@ -0,0 +1,58 @@
+import os
+import argparse
+import urllib.parse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+# Локальна заглушка сервісу NOAA: віддає наявні lab2/data/NOAA_ID*.csv за provinceID,
+# щоб перевіряти завантажувач без доступу до мережі:
+#   python lab2/noaa_stub_server.py --port 8000
+#   python lab2/ad_lab2.py --base-url http://127.0.0.1:8000/get_TS_admin.php
+SOURCE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+
+def find_region_files(directory):
+    files = {}
+    for file in sorted(os.listdir(directory)):
+        if file.startswith("NOAA_ID") and file.endswith('.csv'):
+            region_id = int(file.split("ID")[1].split("_")[0].split(".")[0])
+            files[region_id] = os.path.join(directory, file)
+    return files
+
+class NOAAStubHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 — щоб клієнт міг перевикористовувати з'єднання
+    protocol_version = "HTTP/1.1"
+    region_files = {}
+
+    def do_GET(self):
+        query = urllib.parse.parse_qs(urllib.parse.urlsplit(self.path).query)
+        try:
+            region_id = int(query["provinceID"][0])
+            path = self.region_files[region_id]
+        except (KeyError, ValueError):
+            self.send_error(404, "Unknown provinceID")
+            return
+
+        with open(path, 'rb') as file:
+            data = file.read()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+def make_server(port=8000, directory=SOURCE_DIR):
+    NOAAStubHandler.region_files = find_region_files(directory)
+    return ThreadingHTTPServer(("127.0.0.1", port), NOAAStubHandler)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Локальна заглушка сервісу NOAA VHI")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--dir", default=SOURCE_DIR)
+    args = parser.parse_args()
+
+    server = make_server(args.port, args.dir)
+    print(f"[INFO] Заглушка NOAA слухає на http://127.0.0.1:{args.port}/get_TS_admin.php "
+          f"({len(NOAAStubHandler.region_files)} областей)")
+    server.serve_forever()
@@ -1,13 +1,118 @@
+import os
+import sys
+import numpy as np
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
+
+LAB2_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "lab2")
+sys.path.append(LAB2_DIR)
+from ad_lab2 import load_vhi_data, load_vhi_cube, VHIIndex
 
 # === Завантаження даних ===
+# Читаємо з колонкового кешу лаби 2 лише потрібні колонки; якщо файли NOAA_ID*
+# змінилися, кеш перебудовується автоматично
 @st.cache_data
 def load_data():
-    df = pd.read_csv("lab2/data/final_vhi_data.csv")
+    df = load_vhi_data(os.path.join(LAB2_DIR, "data"),
+                       columns=["Year", "Week", "VCI", "TCI", "VHI", "area", "region_name"])
     return df
 
+# Агрегатний куб лаби 2: середні по областях для вкладки «Порівняння»
+# рахуються з префіксних сум, а не з сирих тижневих рядків
+@st.cache_resource
+def load_cube():
+    return load_vhi_cube(os.path.join(LAB2_DIR, "data"))
+
+# Індекс лаби 2: таблиця, один раз розбита на суцільні відсортовані зрізи по областях
+@st.cache_resource
+def load_index():
+    return VHIIndex(load_data())
+
+# === Кешовані фільтрація, сортування й агрегація ===
+# Результати запам'ятовуються за (область, індекс, тижні, роки, порядок) з обмеженою
+# кількістю записів (найстаріші витісняються), тож повторні рухи слайдерів
+# різними користувачами не сканують таблицю знову
+FILTER_CACHE_SIZE = 256
+
+@st.cache_data(max_entries=FILTER_CACHE_SIZE)
+def filter_data(area, indicator, week_range, year_range, order):
+    result = load_index().select(area, *year_range)
+    result = result[result['Week'].between(*week_range)]
+    if order is not None:
+        result = result.sort_values(by=indicator, ascending=(order == "asc"))
+    return result
+
+@st.cache_data(max_entries=FILTER_CACHE_SIZE)
+def compare_regions(indicator, week_range, year_range):
+    stats = load_cube().query(indicator, year_range, week_range)
+    return stats['mean'].dropna().sort_values()
+
+# === Проріджування часових рядів для графіка ===
+# Графік будується по справжній осі дат і проріджується алгоритмом LTTB
+# (Largest-Triangle-Three-Buckets) до бюджету точок, близького до ширини графіка
+# в пікселях, тож час відмальовки не залежить від кількості обраних років
+CHART_POINTS = 600
+
+def week_dates(years, weeks):
+    years = np.asarray(years, dtype=np.int64)
+    weeks = np.asarray(weeks, dtype=np.int64)
+    return (years - 1970).astype('datetime64[Y]').astype('datetime64[D]') + (weeks - 1) * 7
+
+def lttb(x, y, n_out):
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    # Перша й остання точки зберігаються, решта ділиться на n_out - 2 кошики
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        # З кошика обираємо точку, що утворює найбільший трикутник з попередньою
+        # обраною точкою і середнім наступного кошика
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+@st.cache_data(max_entries=FILTER_CACHE_SIZE)
+def chart_series(area, indicator, week_range, year_range, n_points=CHART_POINTS):
+    data = filter_data(area, indicator, week_range, year_range, None)
+    dates = week_dates(data['Year'], data['Week'])
+    values = data[indicator].to_numpy(dtype=np.float64)
+    keep = lttb(dates.astype(np.float64), values, n_points)
+    return pd.DataFrame({indicator: values[keep]}, index=pd.DatetimeIndex(dates[keep], name="Дата"))
+
+# === Накладання кількох областей та індексів ===
+# Дані беруться зрізом із щільного масиву куба (область × індекс × рік × тиждень),
+# побудованого один раз при завантаженні, тож додавання області — це лише зріз
+@st.cache_data(max_entries=FILTER_CACHE_SIZE)
+def overlay_series(regions, indicators, week_range, year_range, n_points=CHART_POINTS):
+    values, block_years, block_weeks = load_cube().block(regions, indicators, year_range, week_range)
+    dates = week_dates(block_years[:, None], block_weeks[None, :]).ravel()
+    series = values.reshape(len(regions) * len(indicators), -1)
+
+    has_data = ~np.isnan(series).all(axis=0)
+    dates, series = dates[has_data], series[:, has_data]
+
+    # Спільна вісь дат: для кожного ряду — середнє в кожному з n_points кошиків
+    # (одна векторна операція для всіх рядів, розмір результату не залежить від років)
+    if len(dates) > n_points:
+        edges = np.linspace(0, len(dates), n_points, endpoint=False).astype(np.int64)
+        present = ~np.isnan(series)
+        sums = np.add.reduceat(np.where(present, series, 0), edges, axis=1)
+        counts = np.add.reduceat(present.astype(np.int32), edges, axis=1)
+        with np.errstate(invalid='ignore'):
+            series = sums / counts
+        dates = dates[edges]
+
+    columns = [f"{region} · {indicator}" for region in regions for indicator in indicators]
+    return pd.DataFrame(series.T, index=pd.DatetimeIndex(dates, name="Дата"), columns=columns)
+
 df = load_data()
 
 # === Унікальні значення ===
@@ -78,47 +183,58 @@ with col1:
     )
 
 with col2:
-    # === Фільтрація даних ===
-    df_filtered = df[
-        (df['region_name'] == st.session_state.selected_area) &
-        (df['Week'].between(*st.session_state.week_range)) &
-        (df['Year'].between(*st.session_state.year_range))
-    ]
-
-    # === Сортування ===
+    # === Фільтрація та сортування даних ===
+    order = None
     if st.session_state.ascending_order and not st.session_state.descending_order:
-        df_filtered = df_filtered.sort_values(by=st.session_state.indicator, ascending=True)
+        order = "asc"
     elif st.session_state.descending_order and not st.session_state.ascending_order:
-        df_filtered = df_filtered.sort_values(by=st.session_state.indicator, ascending=False)
+        order = "desc"
     elif st.session_state.ascending_order and st.session_state.descending_order:
         st.warning("Не можна обрати одночасно зростання і спадання.")
 
+    df_filtered = filter_data(
+        st.session_state.selected_area, st.session_state.indicator,
+        tuple(st.session_state.week_range), tuple(st.session_state.year_range), order
+    )
+
     # === Вкладки ===
-    tab1, tab2, tab3 = st.tabs(["Таблиця", "Графік", "Порівняння"])
+    tab1, tab2, tab3, tab4 = st.tabs(["Таблиця", "Графік", "Порівняння", "Накладання"])
 
     with tab1:
         st.subheader("📋 Відфільтровані дані")
-        st.dataframe(df_filtered)
+        st.dataframe(df_filtered, column_config={
+            name: st.column_config.NumberColumn(format="%.2f") for name in ["VCI", "TCI", "VHI"]
+        })
 
     with tab2:
         st.subheader("📈 Графік обраної області")
-        fig, ax = plt.subplots()
-        x_labels = df_filtered["Year"].astype(str) + "-" + df_filtered["Week"].astype(str)
-        ax.plot(x_labels, df_filtered[st.session_state.indicator], label=st.session_state.indicator)
-        ax.set_xlabel("Рік-Тиждень")
-        ax.set_ylabel(st.session_state.indicator)
-        ax.set_title(f"{st.session_state.indicator} для {st.session_state.selected_area}")
-        ax.tick_params(axis='x', labelrotation=45)
-        ax.set_xticks(ax.get_xticks()[::10])
-
-        st.pyplot(fig)
+        series = chart_series(
+            st.session_state.selected_area, st.session_state.indicator,
+            tuple(st.session_state.week_range), tuple(st.session_state.year_range)
+        )
+        st.caption(f"{st.session_state.indicator} для {st.session_state.selected_area} "
+                   f"({len(series)} з {len(df_filtered)} точок)")
+        st.line_chart(series, y_label=st.session_state.indicator)
 
     with tab3:
         st.subheader("📊 Порівняння з іншими областями")
-        compare_df = df[
-            (df['Week'].between(*st.session_state.week_range)) &
-            (df['Year'].between(*st.session_state.year_range))
-        ]
-        avg_data = compare_df.groupby("region_name")[st.session_state.indicator].mean().sort_values()
+        avg_data = compare_regions(
+            st.session_state.indicator, tuple(st.session_state.week_range), tuple(st.session_state.year_range)
+        )
         st.bar_chart(avg_data)
 
+    with tab4:
+        st.subheader("🗂️ Накладання областей та індексів")
+        overlay_regions = st.multiselect(
+            "Області", options=list(area_names.values()), default=[st.session_state.selected_area]
+        )
+        overlay_indicators = st.multiselect(
+            "Індекси", ["VCI", "TCI", "VHI"], default=[st.session_state.indicator]
+        )
+        if overlay_regions and overlay_indicators:
+            st.line_chart(overlay_series(
+                tuple(overlay_regions), tuple(overlay_indicators),
+                tuple(st.session_state.week_range), tuple(st.session_state.year_range)
+            ))
+        else:
+            st.info("Оберіть хоча б одну область та один індекс.")
@@ -0,0 +1,176 @@
+import os
+import gc
+import sys
+import json
+import time
+import argparse
+import platform
+import tracemalloc
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+from ad_lab4_p1 import SCENARIOS, BACKENDS, DATA_FILE
+from ad_lab4_gen import generate_power_file
+
+# --- Вимірювання одного сценарію ---
+# Прогрів, кілька повторів з perf_counter і окремий прогін під tracemalloc
+# для пікової пам'яті (NumPy і Pandas звітують свої буфери в tracemalloc)
+def measure(func, data, warmup=1, repeats=5):
+    for _ in range(warmup):
+        func(data)
+
+    timings = []
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        func(data)
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    func(data)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "min_s": min(timings),
+        "median_s": float(np.median(timings)),
+        "mean_s": float(np.mean(timings)),
+        "stdev_s": float(np.std(timings)),
+        "repeats": repeats,
+        "peak_mb": peak / 2**20,
+    }
+
+def measure_prepare(prepare, path):
+    # None, якщо підготовка не знадобилась (сховище вже актуальне)
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    done = prepare(path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if not done:
+        return None
+    return {"min_s": elapsed, "median_s": elapsed, "mean_s": elapsed, "stdev_s": 0.0,
+            "repeats": 1, "peak_mb": peak / 2**20}
+
+def measure_load(load, path, prepare=None, warmup=1, repeats=5):
+    # Бекенди з кроком prepare (memmap) лише відкривають готові дані, тож load
+    # вимірюється як сценарії — з прогрівом і повторами; розбір тексту в інших
+    # бекендах — один холодний прогін, як і раніше
+    if prepare is not None:
+        return load(path), measure(load, path, warmup, repeats)
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    data = load(path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return data, {"min_s": elapsed, "median_s": elapsed, "mean_s": elapsed, "stdev_s": 0.0,
+                  "repeats": 1, "peak_mb": peak / 2**20}
+
+# --- Прогін набору ---
+def run_suite(path=DATA_FILE, backends=None, scenarios=None, rows=None, warmup=1, repeats=5, seed=42):
+    backends = backends or list(BACKENDS)
+    scenarios = scenarios or [name for name, _ in SCENARIOS]
+    results = []
+
+    for backend_name in backends:
+        backend = BACKENDS[backend_name]
+        prepare = backend.get("prepare")
+        convert_stats = measure_prepare(prepare, path) if prepare is not None else None
+        full, load_stats = measure_load(backend["load"], path, prepare, warmup, repeats)
+        if convert_stats is not None:
+            # Одноразова конвертація у сховище — окремий рядок звіту, лише коли вона була
+            results.append({"backend": backend_name, "scenario": "convert", "rows": len(full), **convert_stats})
+            print(f"[{backend_name}] конвертація: {convert_stats['min_s']:.3f} сек")
+        results.append({"backend": backend_name, "scenario": "load", "rows": len(full), **load_stats})
+        print(f"[{backend_name}] завантаження: {load_stats['min_s']:.3f} сек, {len(full)} рядків")
+
+        # Масштабування: ті самі сценарії на перших n рядках
+        for n in sorted(rows or [len(full)]):
+            data = backend["head"](full, min(n, len(full)))
+            for scenario in scenarios:
+                np.random.seed(seed)
+                stats = measure(backend["scenarios"][scenario], data, warmup, repeats)
+                results.append({"backend": backend_name, "scenario": scenario, "rows": len(data), **stats})
+                print(f"[{backend_name}] {scenario:<20} {len(data):>9} рядків: "
+                      f"медіана {stats['median_s'] * 1000:9.3f} мс, пік {stats['peak_mb']:8.2f} МБ")
+        del full, data
+        gc.collect()
+
+    return results
+
+# --- Звіт ---
+def write_report(results, output, paths):
+    report = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "data_files": [os.path.abspath(path) for path in paths],
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "platform": platform.platform(),
+        },
+        "results": results,
+    }
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\nЗвіт збережено у {output}")
+
+def compare_reports(results, baseline_path, threshold=1.2):
+    # Порівнюємо медіани з попереднім звітом; повільніше за поріг — регресія
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r["backend"], r["scenario"], r["rows"]): r for r in json.load(f)["results"]}
+
+    print(f"\nПорівняння з {baseline_path}:")
+    regressions = 0
+    for r in results:
+        old = baseline.get((r["backend"], r["scenario"], r["rows"]))
+        if old is None or old["median_s"] == 0:
+            continue
+        ratio = r["median_s"] / old["median_s"]
+        flag = "РЕГРЕСІЯ" if ratio > threshold else ""
+        regressions += bool(flag)
+        print(f"  {r['backend']:<8} {r['scenario']:<20} {r['rows']:>9}: x{ratio:5.2f} {flag}")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк сценаріїв лаби 4 на різних бекендах")
+    parser.add_argument("--data", default=DATA_FILE, help="файл household_power_consumption.txt")
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS), help="бекенди (за замовчуванням усі)")
+    parser.add_argument("--scenarios", nargs="+", choices=[name for name, _ in SCENARIOS],
+                        help="сценарії (за замовчуванням усі)")
+    parser.add_argument("--rows", nargs="+", type=int, help="розміри вибірки для масштабування")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_report.json", help="JSON-звіт з результатами")
+    parser.add_argument("--baseline", help="попередній звіт для пошуку регресій")
+    parser.add_argument("--generate", nargs="+", type=int,
+                        help="замість --data згенерувати синтетичні файли з такою кількістю записів")
+    parser.add_argument("--generated-dir", default="generated", help="куди зберігати згенеровані файли")
+    args = parser.parse_args()
+
+    # Згенеровані файли кешуються за (кількість записів, seed) і використовуються повторно
+    paths = [args.data]
+    if args.generate:
+        os.makedirs(args.generated_dir, exist_ok=True)
+        paths = []
+        for n in args.generate:
+            path = os.path.join(args.generated_dir, f"power_{n}_seed{args.seed}.txt")
+            if not os.path.exists(path):
+                print(f"[INFO] Генерація {n} записів у {path}...")
+                generate_power_file(path, n, args.seed)
+            paths.append(path)
+
+    results = []
+    for path in paths:
+        results += run_suite(path, args.backends, args.scenarios, args.rows, args.warmup, args.repeats, args.seed)
+    write_report(results, args.output, paths)
+    if args.baseline:
+        compare_reports(results, args.baseline)
@@ -0,0 +1,105 @@
+import os
+import argparse
+from datetime import datetime, timedelta
+import numpy as np
+import pandas as pd
+
+# Генератор синтетичного household_power_consumption.txt у форматі оригіналу UCI:
+# ';' як роздільник, дата d/m/yyyy, час HH:MM:SS, 3 знаки після коми, '?' для пропусків,
+# похвилинні записи з 16/12/2006 17:24:00. Однаковий seed дає однаковий файл.
+COLUMNS = ["Date", "Time", "Global_active_power", "Global_reactive_power", "Voltage",
+           "Global_intensity", "Sub_metering_1", "Sub_metering_2", "Sub_metering_3"]
+START = datetime(2006, 12, 16, 17, 24)
+CHUNK_ROWS = 1_000_000
+MISSING_RATE = 0.0125
+MISSING_RUN = 60  # пропуски йдуть блоками, як відключення лічильника
+
+MAX_VALUE = 255.0
+
+TIME_STRINGS = np.array([f"{m // 60:02d}:{m % 60:02d}:00" for m in range(24 * 60)], dtype=object)
+# Усі значення мають 3 знаки після коми і не перевищують MAX_VALUE, тому замість
+# форматування кожного числа беремо готовий рядок з таблиці (останній елемент — '?')
+VALUE_STRINGS = None
+
+def _value_strings():
+    global VALUE_STRINGS
+    if VALUE_STRINGS is None:
+        n = int(MAX_VALUE * 1000) + 1
+        VALUE_STRINGS = np.array([f"{i // 1000}.{i % 1000:03d}" for i in range(n)] + ["?"], dtype=object)
+    return VALUE_STRINGS
+
+def _date_strings(first_day, last_day):
+    days = [START.date() + timedelta(days=d) for d in range(first_day, last_day + 1)]
+    return np.array([f"{d.day}/{d.month}/{d.year}" for d in days], dtype=object)
+
+def generate_chunk(rng, offset, n):
+    minutes = np.arange(offset, offset + n) + START.hour * 60 + START.minute
+    day, minute_of_day = np.divmod(minutes, 24 * 60)
+    hour = minute_of_day / 60
+
+    # Добовий профіль: вечірній пік споживання, нічний мінімум
+    profile = 0.6 + 0.5 * np.exp(-((hour - 20) ** 2) / 6) + 0.3 * np.exp(-((hour - 8) ** 2) / 4)
+    active = np.clip(rng.gamma(1.3, 0.85, n) * profile, 0.076, 11.0)
+    reactive = np.clip(rng.gamma(1.2, 0.1, n), 0.0, 1.39)
+    voltage = np.clip(rng.normal(240.8, 3.2, n), 223.2, 254.2)
+    intensity = np.round(active * 1000 / voltage, 1)
+
+    # Підлічильники у Вт·год за хвилину; їх сума не перевищує загального споживання
+    budget = active * 1000 / 60
+    sub1 = np.where(rng.random(n) < 0.08, rng.integers(1, 40, n), 0)
+    sub2 = np.where(rng.random(n) < 0.25, rng.integers(1, 4, n), 0) + \
+           np.where(rng.random(n) < 0.03, rng.integers(20, 70, n), 0)
+    sub3 = np.where(rng.random(n) < 0.45, rng.integers(17, 20, n), rng.integers(0, 2, n))
+    scale = np.minimum(1.0, budget / np.maximum(sub1 + sub2 + sub3, 1))
+    sub1, sub2, sub3 = (np.floor(s * scale) for s in (sub1, sub2, sub3))
+
+    chunk = pd.DataFrame({
+        "Date": _date_strings(day[0], day[-1])[day - day[0]],
+        "Time": TIME_STRINGS[minute_of_day],
+        "Global_active_power": active,
+        "Global_reactive_power": reactive,
+        "Voltage": voltage,
+        "Global_intensity": intensity,
+        "Sub_metering_1": sub1,
+        "Sub_metering_2": sub2,
+        "Sub_metering_3": sub3,
+    })
+
+    # Пропуски: усі вимірювання запису замінюються на '?'
+    starts = np.flatnonzero(rng.random(n) < MISSING_RATE / MISSING_RUN)
+    missing = np.zeros(n, dtype=bool)
+    for s in starts:
+        missing[s:s + MISSING_RUN] = True
+    chunk.loc[missing, COLUMNS[2:]] = np.nan
+    return chunk
+
+def format_chunk(chunk):
+    table = _value_strings()
+    columns = [chunk["Date"].to_numpy(), chunk["Time"].to_numpy()]
+    for name in COLUMNS[2:]:
+        values = chunk[name].to_numpy()
+        index = np.rint(np.nan_to_num(values, nan=-1.0) * 1000).astype(np.int64)
+        index[np.isnan(values)] = len(table) - 1
+        columns.append(table[index])
+    return "\n".join(map(";".join, zip(*columns))) + "\n"
+
+def generate_power_file(path, rows, seed=42, chunk_rows=CHUNK_ROWS):
+    rng = np.random.default_rng(seed)
+    tmp_path = path + ".part"
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        f.write(";".join(COLUMNS) + "\n")
+        for offset in range(0, rows, chunk_rows):
+            f.write(format_chunk(generate_chunk(rng, offset, min(chunk_rows, rows - offset))))
+    os.replace(tmp_path, path)
+    return path
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Генератор синтетичного household_power_consumption.txt")
+    parser.add_argument("--rows", type=int, default=2_075_259, help="кількість записів (10^5 … 10^8)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="household_power_consumption.txt")
+    args = parser.parse_args()
+
+    start = datetime.now()
+    generate_power_file(args.output, args.rows, args.seed)
+    print(f"[OK] {args.rows} записів збережено у {args.output} за {(datetime.now() - start).total_seconds():.1f} сек")
@@ -0,0 +1,93 @@
+import os
+import time
+import inspect
+import numpy as np
+import pandas as pd
+from joblib import Memory, Parallel, delayed
+from sklearn.linear_model import lasso_path
+from sklearn.model_selection import KFold
+
+# --- Підбір регуляризації з крос-валідацією ---
+# Замість окремих fit для кожної моделі вся сітка рахується шляхами:
+# Ridge — в замкненій формі через одне SVD на фолд для всіх alpha одразу
+# (alpha = 0 — звичайна лінійна регресія), Lasso — lasso_path з теплим стартом
+# від більшої alpha до меншої. Фолди рахуються паралельно через joblib.
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache")
+RIDGE_ALPHAS = np.r_[0.0, np.logspace(-3, 4, 200)]
+LASSO_ALPHAS = np.logspace(-3, 1, 100)
+CV_FOLDS = 5
+
+memory = Memory(CACHE_DIR, verbose=0)
+
+# Закодована матриця ознак кешується на диску між запусками. Ключ — стан
+# навченої передобробки, вміст DataFrame і код класу передобробки: joblib
+# сам враховує лише код цієї функції, тож зміна transform у ad_lab4_prep.py
+# інакше повертала б застарілу матрицю
+@memory.cache
+def _encode_design(pipeline, df, pipeline_source):
+    return pipeline.transform(df), pipeline.feature_names
+
+def encode_design(pipeline, df):
+    return _encode_design(pipeline, df, inspect.getsource(type(pipeline)))
+
+def _center(X, y):
+    x_mean, y_mean = X.mean(axis=0), y.mean()
+    return X - x_mean, y - y_mean, x_mean, y_mean
+
+def ridge_path(X, y, alphas=RIDGE_ALPHAS):
+    # min ||y - Xw||^2 + alpha ||w||^2 (як у sklearn Ridge) для всіх alpha:
+    # w = V diag(s / (s^2 + alpha)) U^T y; вироджені напрямки (s = 0) відкидаються
+    Xc, yc, x_mean, y_mean = _center(X, y)
+    U, s, Vt = np.linalg.svd(Xc, full_matrices=False)
+    keep = s > s.max() * max(Xc.shape) * np.finfo(float).eps
+    U, s, Vt = U[:, keep], s[keep], Vt[keep]
+    factors = s / (s ** 2 + np.asarray(alphas)[:, None])
+    coefs = (factors * (U.T @ yc)) @ Vt
+    return coefs, y_mean - coefs @ x_mean
+
+def lasso_coef_path(X, y, alphas=LASSO_ALPHAS):
+    # lasso_path проходить alpha за спаданням, стартуючи кожну з попереднього розв'язку
+    Xc, yc, x_mean, y_mean = _center(X, y)
+    order = np.argsort(alphas)[::-1]
+    _, coefs, _ = lasso_path(Xc, yc, alphas=np.asarray(alphas)[order])
+    coefs = coefs.T[np.argsort(order)]
+    return coefs, y_mean - coefs @ x_mean
+
+def _path_mse(X_test, y_test, coefs, intercepts):
+    predictions = X_test @ coefs.T + intercepts
+    return ((predictions - y_test[:, None]) ** 2).mean(axis=0)
+
+def _fold_scores(X, y, train, test, ridge_alphas, lasso_alphas):
+    ridge = _path_mse(X[test], y[test], *ridge_path(X[train], y[train], ridge_alphas))
+    lasso = _path_mse(X[test], y[test], *lasso_coef_path(X[train], y[train], lasso_alphas))
+    return ridge, lasso
+
+def cross_validate(X, y, ridge_alphas=RIDGE_ALPHAS, lasso_alphas=LASSO_ALPHAS, folds=CV_FOLDS,
+                   n_jobs=-1, random_state=42):
+    X, y = np.asarray(X, dtype=np.float64), np.asarray(y, dtype=np.float64)
+    splits = KFold(folds, shuffle=True, random_state=random_state).split(X)
+    scores = Parallel(n_jobs=n_jobs)(delayed(_fold_scores)(X, y, train, test, ridge_alphas, lasso_alphas)
+                                     for train, test in splits)
+    ridge, lasso = (np.array(s) for s in zip(*scores))
+
+    rows = [("LinearRegression" if alpha == 0 else "Ridge", alpha, mse)
+            for alpha, mse in zip(ridge_alphas, ridge.T)]
+    rows += [("Lasso", alpha, mse) for alpha, mse in zip(lasso_alphas, lasso.T)]
+    return pd.DataFrame({
+        "model": [model for model, _, _ in rows],
+        "alpha": [alpha for _, alpha, _ in rows],
+        "mse": [mse.mean() for _, _, mse in rows],
+        "mse_std": [mse.std() for _, _, mse in rows],
+    })
+
+def best_models(results):
+    return results.loc[results.groupby("model")["mse"].idxmin()].reset_index(drop=True)
+
+def run_sweep(title, X, y, **kwargs):
+    start = time.perf_counter()
+    results = cross_validate(X, y, **kwargs)
+    elapsed = time.perf_counter() - start
+    print(f"[{title}] {len(results)} конфігурацій, CV за {elapsed:.3f} сек")
+    for row in best_models(results).itertuples():
+        print(f"[{title}] {row.model}: alpha={row.alpha:.4g}, CV MSE {row.mse:.3f} ± {row.mse_std:.3f}")
+    return results
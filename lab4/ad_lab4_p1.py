@@ -1,10 +1,11 @@
 import pandas as pd
 import numpy as np
 import time
-from datetime import datetime
-
-# --- NumPy версія ---
-print("--- NumPy версія ---")
+import argparse
+from ad_lab4_store import DATA_FILE, TIMESTAMP, TIME, ColumnTable, ensure_store, load_memmap, load_soa
+from ad_lab4_time import parse_time_seconds, seconds_of_day, hour_mask, time_buckets
+from ad_lab4_sample import default_rng, sample_indices, sample_rows, sample_mean, stratified_mean
+from ad_lab4_query import Query, Compare, Range, IsMax
 
 # Задання типів для кожної колонки
 types = [
@@ -19,160 +20,248 @@ types = [
     ("Sub_metering_3", "f8")
 ]
 
+SUB_METERINGS = ['Sub_metering_1', 'Sub_metering_2', 'Sub_metering_3']
+
+# Складені умови сценаріїв 3 і 7 обчислюються одним проходом, без проміжних вибірок
+COMPLEX_CONDITION = Query(Compare('Sub_metering_1', '>', 1.0) & Compare('Voltage', '>', 240))
+INTENSITY_GROUP2 = Query(Range('Global_intensity', 19, 20) &
+                         IsMax('Sub_metering_2', ['Sub_metering_1', 'Sub_metering_3']))
+
+# --- NumPy версія ---
+
 # Завантаження та очищення
-start = time.time()
-df_np = np.genfromtxt("household_power_consumption.txt",
-                      missing_values=["?", ""],
-                      delimiter=';',
-                      dtype=types,
-                      encoding="UTF-8",
-                      names=True)
-df_np = df_np[~np.isnan(df_np['Global_active_power'])]
-end = time.time()
-print("Час завантаження та очищення NumPy:", end - start, "сек")
+def load_numpy(path=DATA_FILE):
+    df_np = np.genfromtxt(path,
+                          missing_values=["?", ""],
+                          delimiter=';',
+                          dtype=types,
+                          encoding="UTF-8",
+                          names=True)
+    return df_np[~np.isnan(df_np['Global_active_power'])]
 
 # 1. Sub_metering_2 > Sub_metering_3
-start = time.time()
-selected_np = df_np[df_np['Sub_metering_2'] > df_np['Sub_metering_3']]
-end = time.time()
-print("NumPy sub_metering_2 > sub_metering_3:", end - start, "сек")
+def np_sub2_gt_sub3(df_np):
+    return df_np[df_np['Sub_metering_2'] > df_np['Sub_metering_3']]
 
 # 2. Випадкові 5000 записів
-start = time.time()
-random_np = df_np[np.random.choice(len(df_np), size=5000, replace=False)]
-end = time.time()
-print("NumPy 5000 випадкових записів:", end - start, "сек")
+def np_random_5000(df_np, rng=None):
+    return sample_rows(df_np, 5000, rng)
 
 # 3. Складна умова
-start = time.time()
-complex_np = df_np[(df_np['Sub_metering_1'] > 1.0) & (df_np['Voltage'] > 240)]
-end = time.time()
-print("NumPy складна умова:", end - start, "сек")
+def np_complex_condition(df_np):
+    return COMPLEX_CONDITION.select(df_np)
 
 # 4. Вибір колонок
-start = time.time()
-columns_np = df_np[['Voltage', 'Global_intensity']]
-end = time.time()
-print("NumPy вибір колонок:", end - start, "сек")
+def np_select_columns(df_np):
+    return df_np[['Voltage', 'Global_intensity']]
 
 # 5. Потужність > 5 кВт
-start = time.time()
-power_np = df_np[df_np['Global_active_power'] > 5]
-end = time.time()
-print("NumPy Global_active_power > 5 кВт:", end - start, "сек")
+def np_power_gt_5(df_np):
+    return df_np[df_np['Global_active_power'] > 5]
 
 # 6. Напруга > 235 В
-start = time.time()
-volt_np = df_np[df_np['Voltage'] > 235]
-end = time.time()
-print("NumPy Voltage > 235 В:", end - start, "сек")
+def np_voltage_gt_235(df_np):
+    return df_np[df_np['Voltage'] > 235]
 
 # 7. Потужність 19-20А, група 2 найбільша
-start = time.time()
-current_np = df_np[(df_np['Global_intensity'] >= 19) & (df_np['Global_intensity'] <= 20)]
-cond_np = current_np[(current_np['Sub_metering_2'] > current_np['Sub_metering_1']) &
-                     (current_np['Sub_metering_2'] > current_np['Sub_metering_3'])]
-end = time.time()
-print("NumPy потужність 19-20А, група 2 найбільша:", end - start, "сек")
+def np_intensity_group2(df_np):
+    return INTENSITY_GROUP2.select(df_np)
 
 # 8. Вибірка 500000 записів, середнє
-start = time.time()
-sample_np = df_np[np.random.choice(len(df_np), size=500000, replace=False)]
-means_np = np.array([
-    np.mean(sample_np['Sub_metering_1']),
-    np.mean(sample_np['Sub_metering_2']),
-    np.mean(sample_np['Sub_metering_3'])
-])
-end = time.time()
-print("NumPy 500000 записів, середнє:", end - start, "сек")
-print("Середні значення NumPy:", means_np)
+def np_sample_500k_mean(df_np, rng=None):
+    return sample_mean(df_np, SUB_METERINGS, 500000, rng)
 
 # 9. Завдання 5 — після 18:00, >6 кВт, група 2 найбільша, кожен 3-й/4-й
-start = time.time()
-times_np = np.array([datetime.strptime(t, "%H:%M:%S").time() for t in df_np['Time']])
-after_18_mask = np.array([t >= datetime.strptime("18:00:00", "%H:%M:%S").time() for t in times_np])
-filtered_np = df_np[(df_np['Global_active_power'] > 6) & after_18_mask]
-group2_mask = (filtered_np['Sub_metering_2'] > filtered_np['Sub_metering_1']) & \
-              (filtered_np['Sub_metering_2'] > filtered_np['Sub_metering_3'])
-filtered_group2_np = filtered_np[group2_mask]
-half_np = len(filtered_group2_np) // 2
-first_half_np = filtered_group2_np[:half_np]
-second_half_np = filtered_group2_np[half_np:]
-final_np_selection = np.concatenate([first_half_np[::3], second_half_np[::4]])
-end = time.time()
-print("NumPy після 18:00, >6кВт, група 2 max, кожен 3-й/4-й:", end - start, "сек")
+def np_after_18_group2(df_np):
+    after_18_mask = hour_mask(parse_time_seconds(df_np['Time']), 18)
+    filtered_np = df_np[(df_np['Global_active_power'] > 6) & after_18_mask]
+    group2_mask = (filtered_np['Sub_metering_2'] > filtered_np['Sub_metering_1']) & \
+                  (filtered_np['Sub_metering_2'] > filtered_np['Sub_metering_3'])
+    filtered_group2_np = filtered_np[group2_mask]
+    half_np = len(filtered_group2_np) // 2
+    first_half_np = filtered_group2_np[:half_np]
+    second_half_np = filtered_group2_np[half_np:]
+    return np.concatenate([first_half_np[::3], second_half_np[::4]])
+
+# 10. Вибірка 500000 записів пропорційно по годинах доби, середнє
+def np_sample_500k_hourly(df_np, rng=None):
+    hours = time_buckets(parse_time_seconds(df_np['Time']))
+    return stratified_mean(df_np, SUB_METERINGS, hours, 500000, rng)
 
 # --- Pandas версія ---
-print("\n--- Pandas версія ---")
 
 # Завантаження та очищення
-start = time.time()
-pandas_df = pd.read_csv("household_power_consumption.txt", sep=';', na_values=['?'])
-pandas_df.dropna(inplace=True)
-end = time.time()
-print("Час завантаження та очищення Pandas:", end - start, "сек")
+def load_pandas(path=DATA_FILE):
+    pandas_df = pd.read_csv(path, sep=';', na_values=['?'])
+    pandas_df.dropna(inplace=True)
+    return pandas_df
 
 # 1. Sub_metering_2 > Sub_metering_3
-start = time.time()
-selected = pandas_df[pandas_df['Sub_metering_2'] > pandas_df['Sub_metering_3']]
-end = time.time()
-print("Pandas sub_metering_2 > sub_metering_3:", end - start, "сек")
+def pd_sub2_gt_sub3(pandas_df):
+    return pandas_df[pandas_df['Sub_metering_2'] > pandas_df['Sub_metering_3']]
 
 # 2. Випадкові 5000 записів
-start = time.time()
-random_sample = pandas_df.sample(n=5000, replace=False)
-end = time.time()
-print("Pandas 5000 випадкових записів:", end - start, "сек")
+def pd_random_5000(pandas_df, rng=None):
+    return pandas_df.iloc[sample_indices(default_rng(rng), len(pandas_df), 5000)]
 
 # 3. Складна умова
-start = time.time()
-complex_selection = pandas_df[(pandas_df['Sub_metering_1'] > 1.0) & (pandas_df['Voltage'] > 240)]
-end = time.time()
-print("Pandas складна умова:", end - start, "сек")
+def pd_complex_condition(pandas_df):
+    return COMPLEX_CONDITION.select(pandas_df)
 
 # 4. Вибір колонок
-start = time.time()
-selected_columns = pandas_df.iloc[:, [4, 5]]
-end = time.time()
-print("Pandas вибір колонок:", end - start, "сек")
+def pd_select_columns(pandas_df):
+    return pandas_df.iloc[:, [4, 5]]
 
 # 5. Потужність > 5 кВт
-start = time.time()
-power_gt_5 = pandas_df[pandas_df['Global_active_power'] > 5]
-end = time.time()
-print("Pandas Global_active_power > 5 кВт:", end - start, "сек")
+def pd_power_gt_5(pandas_df):
+    return pandas_df[pandas_df['Global_active_power'] > 5]
 
 # 6. Напруга > 235 В
-start = time.time()
-voltage_gt_235 = pandas_df[pandas_df['Voltage'] > 235]
-end = time.time()
-print("Pandas Voltage > 235 В:", end - start, "сек")
+def pd_voltage_gt_235(pandas_df):
+    return pandas_df[pandas_df['Voltage'] > 235]
 
 # 7. Потужність 19-20А, група 2 найбільша
-start = time.time()
-current_range = pandas_df[(pandas_df['Global_intensity'] >= 19) & (pandas_df['Global_intensity'] <= 20)]
-condition_groups = current_range[(current_range['Sub_metering_2'] > current_range['Sub_metering_1']) &
-                                 (current_range['Sub_metering_2'] > current_range['Sub_metering_3'])]
-end = time.time()
-print("Pandas потужність 19-20А, група 2 найбільша:", end - start, "сек")
+def pd_intensity_group2(pandas_df):
+    return INTENSITY_GROUP2.select(pandas_df)
 
 # 8. Вибірка 500000 записів, середнє
-start = time.time()
-sample_500k = pandas_df.sample(n=500000, replace=False)
-means = sample_500k[['Sub_metering_1', 'Sub_metering_2', 'Sub_metering_3']].mean()
-end = time.time()
-print("Pandas 500000 записів, середнє:", end - start, "сек")
-print("Середні значення Pandas:", means)
+def pd_sample_500k_mean(pandas_df, rng=None):
+    return pd.Series(sample_mean(pandas_df, SUB_METERINGS, 500000, rng), index=SUB_METERINGS)
 
 # 9. Завдання 5 — після 18:00, >6 кВт, група 2 найбільша, кожен 3-й/4-й
-start = time.time()
-pandas_df['Time'] = pd.to_datetime(pandas_df['Time'], format='%H:%M:%S', errors='coerce')
-filtered_time = pandas_df[(pandas_df['Time'].dt.hour >= 18) & (pandas_df['Global_active_power'] > 6)]
-filtered_group2 = filtered_time[(filtered_time['Sub_metering_2'] > filtered_time['Sub_metering_1']) &
-                                (filtered_time['Sub_metering_2'] > filtered_time['Sub_metering_3'])]
-half = len(filtered_group2) // 2
-first_half = filtered_group2.iloc[:half]
-second_half = filtered_group2.iloc[half:]
-final_selection = pd.concat([first_half.iloc[::3], second_half.iloc[::4]])
-end = time.time()
-print("Pandas після 18:00, >6кВт, група 2 max, кожен 3-й/4-й:", end - start, "сек")
+def pd_after_18_group2(pandas_df):
+    # Час розбирається в окремий масив секунд, а не в pandas_df['Time'], щоб повторні
+    # запуски сценарію працювали з тими самими вхідними даними
+    after_18_mask = hour_mask(parse_time_seconds(pandas_df['Time'].to_numpy()), 18)
+    filtered_time = pandas_df[after_18_mask & (pandas_df['Global_active_power'] > 6)]
+    filtered_group2 = filtered_time[(filtered_time['Sub_metering_2'] > filtered_time['Sub_metering_1']) &
+                                    (filtered_time['Sub_metering_2'] > filtered_time['Sub_metering_3'])]
+    half = len(filtered_group2) // 2
+    first_half = filtered_group2.iloc[:half]
+    second_half = filtered_group2.iloc[half:]
+    return pd.concat([first_half.iloc[::3], second_half.iloc[::4]])
+
+# 10. Вибірка 500000 записів пропорційно по годинах доби, середнє
+def pd_sample_500k_hourly(pandas_df, rng=None):
+    hours = time_buckets(parse_time_seconds(pandas_df['Time'].to_numpy()))
+    return pd.Series(stratified_mean(pandas_df, SUB_METERINGS, hours, 500000, rng), index=SUB_METERINGS)
+
+# --- Таблиці колонок (np.memmap і SoA) ---
+# Сценарії 1-8 — ті самі np_* функції: ColumnTable має той самий доступ до полів
+# і рядків, що й структурований масив. Для сценаріїв 9-10 час доби вже числовий:
+# колонка Time (секунди від півночі) у SoA або Timestamp у сховищі memmap.
+def time_of_day(table):
+    return table[TIME] if TIME in table.names else seconds_of_day(table[TIMESTAMP])
+
+def ct_after_18_group2(table):
+    after_18_mask = hour_mask(time_of_day(table), 18)
+    filtered = table[(table['Global_active_power'] > 6) & after_18_mask]
+    group2_mask = (filtered['Sub_metering_2'] > filtered['Sub_metering_1']) & \
+                  (filtered['Sub_metering_2'] > filtered['Sub_metering_3'])
+    filtered_group2 = filtered[group2_mask]
+    half = len(filtered_group2) // 2
+    return ColumnTable.concat([filtered_group2[:half][::3], filtered_group2[half:][::4]])
+
+def ct_sample_500k_hourly(table, rng=None):
+    return stratified_mean(table, SUB_METERINGS, time_buckets(time_of_day(table)), 500000, rng)
+
+# --- Реєстр сценаріїв ---
+# Кожен сценарій описаний один раз; бекенд — це функція завантаження, функція
+# обрізання до перших n рядків і реалізація кожного сценарію
+SCENARIOS = [
+    ("sub2_gt_sub3", "sub_metering_2 > sub_metering_3"),
+    ("random_5000", "5000 випадкових записів"),
+    ("complex_condition", "складна умова"),
+    ("select_columns", "вибір колонок"),
+    ("power_gt_5", "Global_active_power > 5 кВт"),
+    ("voltage_gt_235", "Voltage > 235 В"),
+    ("intensity_group2", "потужність 19-20А, група 2 найбільша"),
+    ("sample_500k_mean", "500000 записів, середнє"),
+    ("after_18_group2", "після 18:00, >6кВт, група 2 max, кожен 3-й/4-й"),
+    ("sample_500k_hourly", "500000 записів по годинах доби, середнє"),
+]
+
+# Реалізації NumPy однакові для структурованого масиву і для ColumnTable (memmap,
+# SoA); у колонкових бекендів відрізняються лише сценарії з часом доби
+NP_SCENARIOS = {
+    "sub2_gt_sub3": np_sub2_gt_sub3,
+    "random_5000": np_random_5000,
+    "complex_condition": np_complex_condition,
+    "select_columns": np_select_columns,
+    "power_gt_5": np_power_gt_5,
+    "voltage_gt_235": np_voltage_gt_235,
+    "intensity_group2": np_intensity_group2,
+    "sample_500k_mean": np_sample_500k_mean,
+    "after_18_group2": np_after_18_group2,
+    "sample_500k_hourly": np_sample_500k_hourly,
+}
+COLUMN_SCENARIOS = {**NP_SCENARIOS, "after_18_group2": ct_after_18_group2,
+                    "sample_500k_hourly": ct_sample_500k_hourly}
+
+BACKENDS = {
+    "numpy": {
+        "title": "NumPy",
+        "load": load_numpy,
+        "head": lambda data, n: data[:n],
+        "scenarios": NP_SCENARIOS,
+    },
+    "pandas": {
+        "title": "Pandas",
+        "load": load_pandas,
+        "head": lambda data, n: data.iloc[:n],
+        "scenarios": {
+            "sub2_gt_sub3": pd_sub2_gt_sub3,
+            "random_5000": pd_random_5000,
+            "complex_condition": pd_complex_condition,
+            "select_columns": pd_select_columns,
+            "power_gt_5": pd_power_gt_5,
+            "voltage_gt_235": pd_voltage_gt_235,
+            "intensity_group2": pd_intensity_group2,
+            "sample_500k_mean": pd_sample_500k_mean,
+            "after_18_group2": pd_after_18_group2,
+            "sample_500k_hourly": pd_sample_500k_hourly,
+        },
+    },
+    "memmap": {
+        "title": "Memmap",
+        # Одноразова конвертація тексту в сховище — окремий крок, щоб час load
+        # завжди означав відкриття готового сховища
+        "prepare": ensure_store,
+        "load": load_memmap,
+        "head": lambda data, n: data[:n],
+        "scenarios": COLUMN_SCENARIOS,
+    },
+    "soa": {
+        "title": "SoA",
+        "load": load_soa,
+        "head": lambda data, n: data[:n],
+        "scenarios": COLUMN_SCENARIOS,
+    },
+}
+# Без прапорця скрипт, як і раніше, порівнює лише NumPy і Pandas: бекенд memmap
+# при першому запуску створює поруч із файлом даних колонкове сховище
+DEFAULT_BACKENDS = ["numpy", "pandas"]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сценарії лаби 4 на household_power_consumption.txt")
+    parser.add_argument("--data", default=DATA_FILE)
+    parser.add_argument("--backends", nargs="+", choices=list(BACKENDS), default=DEFAULT_BACKENDS,
+                        help="бекенди (за замовчуванням numpy pandas; memmap створює <data>_columns/)")
+    args = parser.parse_args()
+
+    for number, name in enumerate(args.backends):
+        backend = BACKENDS[name]
+        print(("\n" if number else "") + f"--- {backend['title']} версія ---")
+
+        start = time.time()
+        data = backend["load"](args.data)
+        end = time.time()
+        print(f"Час завантаження та очищення {backend['title']}:", end - start, "сек")
+
+        for scenario, label in SCENARIOS:
+            start = time.time()
+            result = backend["scenarios"][scenario](data)
+            end = time.time()
+            print(f"{backend['title']} {label}:", end - start, "сек")
+            if scenario in ("sample_500k_mean", "sample_500k_hourly"):
+                print(f"Середні значення {backend['title']}:", result)
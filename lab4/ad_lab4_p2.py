@@ -4,131 +4,258 @@ import matplotlib
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
-from sklearn.preprocessing import OneHotEncoder
+import json
+import time
+import hashlib
+import inspect
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from sklearn.model_selection import train_test_split
 from sklearn.linear_model import LinearRegression, Ridge, Lasso
 from sklearn.metrics import mean_squared_error
 from scipy.stats import pearsonr, spearmanr
+from ad_lab4_models import CV_FOLDS, encode_design, run_sweep
+from ad_lab4_prep import TitanicPreprocessor
 
 # --- КОНФІГУРАЦІЯ ---
-matplotlib.use('TkAgg')
-save_figures = False  # Змінити на True, якщо хочу зберегти
-os.makedirs("plots", exist_ok=True)
+DATA_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "lab2", "data", "train.csv")
+PLOTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "plots")
+save_figures = False  # Змінити на True, якщо хочу зберегти (у режимі --batch графіки зберігаються завжди)
+
+# Пакетний режим: рендер без GUI (Agg) у пулі процесів. Поруч із графіками
+# зберігається manifest.json з хешем вхідних даних і коду кожного графіка —
+# незмінені графіки не перемальовуються.
+MANIFEST_FILE = "manifest.json"
+PAIRPLOT_COLUMNS = ["Age", "Fare", "Pclass", "Survived"]
+PAIRPLOT_MAX_ROWS = 1000  # pairplot будується по всіх парах колонок; більші вибірки проріджуємо
 
 # --- КРОК 1: Завантаження даних ---
-df = pd.read_csv("C:/Users/Dasha Koshykova/PycharmProjects/pythonProject5/lab2/data/train.csv")
-
-# --- КРОК 2: Огляд даних ---
-print(df.head())
-print(df.isnull().sum())
-
-# --- КРОК 3: Обробка пропущених значень ---
-df_filled = df.copy()
-df_filled["Age"] = df_filled["Age"].fillna(df_filled["Age"].median())
-df_filled["Embarked"] = df_filled["Embarked"].fillna(df_filled["Embarked"].mode()[0])
-df_filled["Cabin"] = df_filled["Cabin"].fillna("Unknown")
-
-# --- КРОК 4: Нормалізація і стандартизація ---
-def normalize(arr):
-    return (arr - np.min(arr)) / (np.max(arr) - np.min(arr))
-
-def standardize(arr):
-    return (arr - np.mean(arr)) / np.std(arr)
-
-age_array = df_filled["Age"].values
-age_normalized = normalize(age_array)
-age_standardized = standardize(age_array)
-
-# --- КРОК 5: Гістограма віку ---
-plt.figure(figsize=(8, 5))
-plt.hist(df_filled["Age"], bins=10, edgecolor='black')
-plt.title("Age Distribution")
-plt.xlabel("Age")
-plt.ylabel("Count")
-plt.grid(True)
-if save_figures:
-    plt.savefig("plots/age_histogram.png")
-plt.show()
-
-# --- КРОК 6: Графік залежності Fare від Age ---
-plt.figure(figsize=(8, 5))
-plt.scatter(df_filled["Age"], df_filled["Fare"], alpha=0.6)
-plt.title("Fare vs Age")
-plt.xlabel("Age")
-plt.ylabel("Fare")
-plt.grid(True)
-if save_figures:
-    plt.savefig("plots/fare_vs_age.png")
-plt.show()
-
-# --- КРОК 7: Коефіцієнти кореляції ---
-pearson_corr, _ = pearsonr(df_filled["Age"], df_filled["Fare"])
-spearman_corr, _ = spearmanr(df_filled["Age"], df_filled["Fare"])
-print(f"Pearson: {pearson_corr:.3f}")
-print(f"Spearman: {spearman_corr:.3f}")
-
-# --- КРОК 8: One Hot Encoding ---
-encoder = OneHotEncoder(sparse_output=False)
-embarked_encoded = encoder.fit_transform(df_filled[["Embarked"]])
-embarked_df = pd.DataFrame(embarked_encoded, columns=encoder.get_feature_names_out(["Embarked"]))
-df_encoded = pd.concat([df_filled.reset_index(drop=True), embarked_df], axis=1)
-
-# --- КРОК 9: Візуалізація багатовимірних даних ---
-plot = sns.pairplot(df_filled[["Age", "Fare", "Pclass", "Survived"]])
-if save_figures:
-    plot.savefig("plots/pairplot.png")
-plt.show()
-
-# --- КРОК 10: Регресія ---
-X = df_filled[["Age"]]
-y = df_filled["Fare"]
-
-X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.5, random_state=42)
-
-models = {
-    "LinearRegression": LinearRegression(),
-    "Ridge": Ridge(alpha=1.0),
-    "Lasso": Lasso(alpha=0.1)
-}
-
-for name, model in models.items():
-    model.fit(X_train, y_train)
-    y_pred = model.predict(X_test)
-    mse = mean_squared_error(y_test, y_pred)
-    print(f"{name} MSE: {mse:.3f}")
-
-    plt.figure(figsize=(8, 5))
-    plt.scatter(X_test, y_test, color='blue', label='Actual', alpha=0.6)
-    plt.plot(X_test, y_pred, color='red', label='Predicted')
+def load_data(path=DATA_FILE):
+    return pd.read_csv(path)
+
+# --- КРОК 3-4, 8, 11: Передобробка ---
+# Заповнення пропусків, масштабування й one-hot — у TitanicPreprocessor (ad_lab4_prep.py).
+# Якщо передано --pipeline і файл існує, статистики беруться з нього без повторного fit.
+def load_pipeline(df, path=None):
+    if path and os.path.exists(path):
+        return TitanicPreprocessor.load(path)
+    pipeline = TitanicPreprocessor().fit(df)
+    if path:
+        pipeline.save(path)
+    return pipeline
+
+# --- Графіки ---
+# Кожна функція лише малює фігуру з переданих даних, тому однаково працює
+# в інтерактивному режимі (plt.show) і в пакетному (savefig у процесі пулу).
+
+# КРОК 5: Гістограма віку
+def plot_age_histogram(age):
+    fig = plt.figure(figsize=(8, 5))
+    plt.hist(age, bins=10, edgecolor='black')
+    plt.title("Age Distribution")
+    plt.xlabel("Age")
+    plt.ylabel("Count")
+    plt.grid(True)
+    return fig
+
+# КРОК 6: Графік залежності Fare від Age
+def plot_fare_vs_age(age, fare):
+    fig = plt.figure(figsize=(8, 5))
+    plt.scatter(age, fare, alpha=0.6)
+    plt.title("Fare vs Age")
+    plt.xlabel("Age")
+    plt.ylabel("Fare")
+    plt.grid(True)
+    return fig
+
+# КРОК 9: Візуалізація багатовимірних даних
+def plot_pairplot(frame):
+    return sns.pairplot(frame).figure
+
+def pairplot_frame(df, max_rows=PAIRPLOT_MAX_ROWS):
+    frame = df[PAIRPLOT_COLUMNS]
+    if len(frame) > max_rows:
+        frame = frame.sample(n=max_rows, random_state=42)
+    return frame
+
+# КРОК 10: Регресія
+def plot_regression(name, x, y, y_pred):
+    fig = plt.figure(figsize=(8, 5))
+    plt.scatter(x, y, color='blue', label='Actual', alpha=0.6)
+    plt.plot(x, y_pred, color='red', label='Predicted')
     plt.title(f"{name} Regression")
     plt.xlabel("Age")
     plt.ylabel("Fare")
     plt.legend()
     plt.grid(True)
-    if save_figures:
-        plt.savefig(f"plots/regression_{name.lower()}.png")
-    plt.show()
-
-# --- КРОК 11: Мультифакторна регресія ---
-encoder_multi = OneHotEncoder(drop='first', sparse_output=False)
-categorical_cols = ['Sex', 'Embarked']
-encoded_cats = encoder_multi.fit_transform(df_filled[categorical_cols])
-encoded_cat_df = pd.DataFrame(encoded_cats, columns=encoder_multi.get_feature_names_out(categorical_cols))
-
-numerical_cols = ['Age', 'Pclass', 'SibSp', 'Parch']
-X_multi = pd.concat([df_filled[numerical_cols].reset_index(drop=True), encoded_cat_df], axis=1)
-y_multi = df_filled['Fare']
-
-X_train_m, X_test_m, y_train_m, y_test_m = train_test_split(X_multi, y_multi, test_size=0.5, random_state=42)
-
-models_multi = {
-    "LinearRegression": LinearRegression(),
-    "Ridge": Ridge(alpha=1.0),
-    "Lasso": Lasso(alpha=0.1)
-}
-
-for name, model in models_multi.items():
-    model.fit(X_train_m, y_train_m)
-    y_pred_m = model.predict(X_test_m)
-    mse_m = mean_squared_error(y_test_m, y_pred_m)
-    print(f"[Multi] {name} MSE: {mse_m:.3f}")
+    return fig
+
+# --- Пакетний рендер ---
+def _digest_value(digest, value):
+    if isinstance(value, pd.DataFrame):
+        digest.update(repr(list(value.columns)).encode())
+        for column in value.columns:
+            _digest_value(digest, value[column].to_numpy())
+    elif isinstance(value, (pd.Series, np.ndarray)):
+        array = np.ascontiguousarray(np.asarray(value))
+        digest.update(f"{array.dtype}{array.shape}".encode())
+        digest.update(array.tobytes())
+    else:
+        digest.update(repr(value).encode())
+
+def figure_hash(func, kwargs):
+    # Хеш охоплює код функції малювання, тож зміна оформлення теж перемальовує графік
+    digest = hashlib.sha256(inspect.getsource(func).encode())
+    for key in sorted(kwargs):
+        digest.update(key.encode())
+        _digest_value(digest, kwargs[key])
+    return digest.hexdigest()
+
+def render_figure(path, func, kwargs):
+    matplotlib.use("Agg")
+    fig = func(**kwargs)
+    fig.savefig(path)
+    plt.close(fig)
+    return path
+
+def render_all(figures, plots_dir=PLOTS_DIR, workers=None, force=False):
+    # figures — список (ім'я файлу, функція малювання, аргументи)
+    os.makedirs(plots_dir, exist_ok=True)
+    manifest_path = os.path.join(plots_dir, MANIFEST_FILE)
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        manifest = {}
+
+    pending = {}
+    for filename, func, kwargs in figures:
+        digest = figure_hash(func, kwargs)
+        path = os.path.join(plots_dir, filename)
+        if force or manifest.get(filename) != digest or not os.path.exists(path):
+            pending[filename] = (path, func, kwargs, digest)
+
+    start = time.perf_counter()
+    workers = min(workers or os.cpu_count(), len(pending))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(render_figure, *item[:3]): filename for filename, item in pending.items()}
+            for future in as_completed(futures):
+                future.result()
+                manifest[futures[future]] = pending[futures[future]][3]
+    else:
+        for filename, (path, func, kwargs, digest) in pending.items():
+            render_figure(path, func, kwargs)
+            manifest[filename] = digest
+
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    print(f"[OK] Графіків перемальовано: {len(pending)}, без змін: {len(figures) - len(pending)} "
+          f"({time.perf_counter() - start:.2f} сек, {plots_dir})")
+
+def show_all(figures):
+    matplotlib.use('TkAgg')
+    for filename, func, kwargs in figures:
+        func(**kwargs)
+        if save_figures:
+            plt.savefig(os.path.join(PLOTS_DIR, filename))
+        plt.show()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Аналіз Titanic: очистка, візуалізація, регресія")
+    parser.add_argument("--data", default=DATA_FILE, help="шлях до train.csv")
+    parser.add_argument("--batch", action="store_true",
+                        help="без GUI: зберегти всі графіки у plots/ паралельно, пропускаючи незмінені")
+    parser.add_argument("--workers", type=int, help="кількість процесів для рендеру і фолдів CV (за замовчуванням — усі ядра)")
+    parser.add_argument("--force", action="store_true", help="перемалювати всі графіки")
+    parser.add_argument("--pairplot-rows", type=int, default=PAIRPLOT_MAX_ROWS,
+                        help="максимум рядків для pairplot; більші дані проріджуються")
+    parser.add_argument("--cv-folds", type=int, default=CV_FOLDS, help="кількість фолдів для підбору alpha")
+    parser.add_argument("--pipeline", help="JSON зі збереженою передобробкою (створюється, якщо його немає)")
+    args = parser.parse_args()
+
+    # --- КРОК 1: Завантаження даних ---
+    df = load_data(args.data)
+
+    # --- КРОК 2: Огляд даних ---
+    print(df.head())
+    print(df.isnull().sum())
+
+    # --- КРОК 3: Обробка пропущених значень ---
+    pipeline = load_pipeline(df, args.pipeline)
+    df_filled = pipeline.fill(df)
+
+    # --- КРОК 4: Нормалізація і стандартизація ---
+    age_array = df_filled["Age"].values
+    age_normalized = pipeline.normalize(age_array, "Age")
+    age_standardized = pipeline.standardize(age_array, "Age")
+
+    # --- КРОК 5-6: Гістограма віку і Fare від Age ---
+    figures = [
+        ("age_histogram.png", plot_age_histogram, {"age": df_filled["Age"]}),
+        ("fare_vs_age.png", plot_fare_vs_age, {"age": df_filled["Age"], "fare": df_filled["Fare"]}),
+    ]
+
+    # --- КРОК 7: Коефіцієнти кореляції ---
+    pearson_corr, _ = pearsonr(df_filled["Age"], df_filled["Fare"])
+    spearman_corr, _ = spearmanr(df_filled["Age"], df_filled["Fare"])
+    print(f"Pearson: {pearson_corr:.3f}")
+    print(f"Spearman: {spearman_corr:.3f}")
+
+    # --- КРОК 8: One Hot Encoding ---
+    encoder = TitanicPreprocessor(numerical=[], categorical=["Embarked"], drop_first=False).fit(df_filled)
+    embarked_df = pd.DataFrame(encoder.transform(df_filled), columns=encoder.feature_names, index=df_filled.index)
+    df_encoded = pd.concat([df_filled, embarked_df], axis=1)
+
+    # --- КРОК 9: Візуалізація багатовимірних даних ---
+    figures.append(("pairplot.png", plot_pairplot, {"frame": pairplot_frame(df_filled, args.pairplot_rows)}))
+
+    # --- КРОК 10: Регресія ---
+    X = df_filled[["Age"]]
+    y = df_filled["Fare"]
+
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.5, random_state=42)
+
+    models = {
+        "LinearRegression": LinearRegression(),
+        "Ridge": Ridge(alpha=1.0),
+        "Lasso": Lasso(alpha=0.1)
+    }
+
+    for name, model in models.items():
+        model.fit(X_train, y_train)
+        y_pred = model.predict(X_test)
+        mse = mean_squared_error(y_test, y_pred)
+        print(f"{name} MSE: {mse:.3f}")
+        figures.append((f"regression_{name.lower()}.png", plot_regression,
+                        {"name": name, "x": X_test["Age"], "y": y_test, "y_pred": y_pred}))
+
+    # --- КРОК 11: Мультифакторна регресія ---
+    # Ознаки: Age, Pclass, SibSp, Parch + one-hot Sex/Embarked без першої категорії;
+    # матриця кешується на диску (encode_design)
+    X_multi, feature_names = encode_design(pipeline, df)
+    y_multi = df_filled['Fare']
+
+    X_train_m, X_test_m, y_train_m, y_test_m = train_test_split(X_multi, y_multi, test_size=0.5, random_state=42)
+
+    models_multi = {
+        "LinearRegression": LinearRegression(),
+        "Ridge": Ridge(alpha=1.0),
+        "Lasso": Lasso(alpha=0.1)
+    }
+
+    for name, model in models_multi.items():
+        model.fit(X_train_m, y_train_m)
+        y_pred_m = model.predict(X_test_m)
+        mse_m = mean_squared_error(y_test_m, y_pred_m)
+        print(f"[Multi] {name} MSE: {mse_m:.3f}")
+
+    # --- КРОК 12: Підбір регуляризації (шляхи Ridge/Lasso, k-fold CV) ---
+    run_sweep("CV Age", df_filled[["Age"]].to_numpy(), y.to_numpy(), folds=args.cv_folds, n_jobs=args.workers or -1)
+    run_sweep("CV Multi", X_multi, y_multi.to_numpy(), folds=args.cv_folds, n_jobs=args.workers or -1)
+
+    # --- Графіки: файли у plots/ без GUI або показ по черзі ---
+    if args.batch:
+        render_all(figures, PLOTS_DIR, args.workers, args.force)
+    else:
+        show_all(figures)
@@ -0,0 +1,125 @@
+import json
+import numpy as np
+import pandas as pd
+
+# --- Передобробка Titanic ---
+# Один об'єкт замість розкиданих fillna / normalize / standardize / OneHotEncoder:
+# fit один раз вивчає медіани, моди, межі та середні числових колонок і
+# категорії категоріальних, а transform для кожної нової партії записів лише
+# читає потрібні колонки і пише їх у заздалегідь виділену матрицю, не копіюючи
+# весь DataFrame. Стан зберігається у JSON і завантажується без повторного fit.
+NUMERICAL = ["Age", "Pclass", "SibSp", "Parch"]
+CATEGORICAL = ["Sex", "Embarked"]
+FILL_CONSTANTS = {"Cabin": "Unknown"}
+SCALERS = (None, "minmax", "standard")
+
+class TitanicPreprocessor:
+    def __init__(self, numerical=NUMERICAL, categorical=CATEGORICAL, scale=None, drop_first=True):
+        if scale not in SCALERS:
+            raise ValueError(f"Невідомий спосіб масштабування: {scale}")
+        self.numerical = list(numerical)
+        self.categorical = list(categorical)
+        self.scale = scale
+        self.drop_first = drop_first
+        self.stats = {}
+        self.categories = {}
+
+    # --- Навчання ---
+    def fit(self, df):
+        self.stats, self.categories = {}, {}
+        for column in self.numerical:
+            values = df[column].to_numpy(dtype=np.float64)
+            median = float(np.nanmedian(values))
+            filled = np.where(np.isnan(values), median, values)
+            self.stats[column] = {
+                "median": median,
+                "min": float(filled.min()),
+                "max": float(filled.max()),
+                "mean": float(filled.mean()),
+                "std": float(filled.std()),
+            }
+        for column in self.categorical:
+            # Мода числової категорії (Pclass) — скаляр NumPy; для JSON зводимо до
+            # рідного типу Python. Колонка може бути й числовою, тож статистики доповнюємо
+            mode = df[column].mode()[0]
+            mode = mode.item() if hasattr(mode, "item") else mode
+            self.stats.setdefault(column, {})["mode"] = mode
+            self.categories[column] = sorted(df[column].fillna(mode).unique().tolist())
+        return self
+
+    @property
+    def feature_names(self):
+        names = list(self.numerical)
+        for column in self.categorical:
+            names += [f"{column}_{value}" for value in self.categories[column][int(self.drop_first):]]
+        return names
+
+    # --- Застосування ---
+    def fill(self, df):
+        # Заповнений DataFrame для графіків і кореляцій (КРОК 3)
+        values = {column: self.stats[column]["median"] for column in self.numerical}
+        values.update({column: self.stats[column]["mode"] for column in self.categorical})
+        values.update({column: value for column, value in FILL_CONSTANTS.items() if column in df})
+        return df.fillna(values)
+
+    def normalize(self, values, column):
+        stats = self.stats[column]
+        return (values - stats["min"]) / (stats["max"] - stats["min"])
+
+    def standardize(self, values, column):
+        stats = self.stats[column]
+        return (values - stats["mean"]) / stats["std"]
+
+    def transform(self, df):
+        n = len(df)
+        out = np.zeros((n, len(self.feature_names)))
+        for j, column in enumerate(self.numerical):
+            values = out[:, j]
+            values[:] = df[column].to_numpy(dtype=np.float64)
+            values[np.isnan(values)] = self.stats[column]["median"]
+            if self.scale == "minmax":
+                values[:] = self.normalize(values, column)
+            elif self.scale == "standard":
+                values[:] = self.standardize(values, column)
+
+        offset = len(self.numerical)
+        rows = np.arange(n)
+        for column in self.categorical:
+            categories = self.categories[column]
+            values = df[column].fillna(self.stats[column]["mode"]).to_numpy()
+            # Невідомі категорії (код -1) і відкинута перша категорія дають нульовий рядок
+            codes = pd.Categorical(values, categories=categories).codes - int(self.drop_first)
+            valid = codes >= 0
+            out[rows[valid], offset + codes[valid]] = 1.0
+            offset += len(categories) - int(self.drop_first)
+        return out
+
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+
+    def transform_batches(self, path, batch_rows=10_000):
+        # Потокове оцінювання нових записів: CSV читається партіями, статистики вже вивчені
+        for batch in pd.read_csv(path, chunksize=batch_rows):
+            yield self.transform(batch)
+
+    # --- Збереження ---
+    def save(self, path):
+        state = {
+            "numerical": self.numerical,
+            "categorical": self.categorical,
+            "scale": self.scale,
+            "drop_first": self.drop_first,
+            "stats": self.stats,
+            "categories": self.categories,
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(state, f, ensure_ascii=False, indent=2)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+        pipeline = cls(state["numerical"], state["categorical"], state["scale"], state["drop_first"])
+        pipeline.stats = state["stats"]
+        pipeline.categories = state["categories"]
+        return pipeline
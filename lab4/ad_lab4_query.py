@@ -0,0 +1,155 @@
+import numpy as np
+
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
+
+# --- Складені умови відбору ---
+# Умова описується один раз (діапазон, порівняння колонок, "колонка —
+# максимум групи") і обчислюється за один прохід без проміжних копій даних:
+# через numexpr, якщо він встановлений, інакше шматками по CHUNK_ROWS рядків
+# з маскою, що будується на місці (out=...) у буферах розміру шматка.
+# Невеликий шматок тримає в кеші рядки, спільні для всіх колонок умови
+# (для структурованого масиву колонки лежать через крок запису).
+CHUNK_ROWS = 1 << 13
+
+OPERATORS = {
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+    "==": np.equal,
+    "!=": np.not_equal,
+}
+
+class Predicate:
+    def __and__(self, other):
+        return All(self, other)
+
+    @property
+    def columns(self):
+        raise NotImplementedError
+
+    def expression(self):
+        # Рядок для numexpr.evaluate
+        raise NotImplementedError
+
+    def evaluate(self, data, start, stop, out, tmp):
+        # Записує маску для рядків [start, stop) в out; tmp — робочий буфер того ж розміру
+        raise NotImplementedError
+
+def _operand(value):
+    return value if isinstance(value, str) else repr(float(value))
+
+def _slice(data, value, start, stop):
+    return data[value][start:stop] if isinstance(value, str) else value
+
+class Compare(Predicate):
+    # Колонка порівнюється з числом або з іншою колонкою: Compare('Voltage', '>', 240),
+    # Compare('Sub_metering_2', '>', 'Sub_metering_3')
+    def __init__(self, left, op, right):
+        if op not in OPERATORS:
+            raise ValueError(f"Невідомий оператор: {op}")
+        self.left, self.op, self.right = left, op, right
+
+    @property
+    def columns(self):
+        return [value for value in (self.left, self.right) if isinstance(value, str)]
+
+    def expression(self):
+        return f"({_operand(self.left)} {self.op} {_operand(self.right)})"
+
+    def evaluate(self, data, start, stop, out, tmp):
+        OPERATORS[self.op](_slice(data, self.left, start, stop), _slice(data, self.right, start, stop), out=out)
+
+class Range(Predicate):
+    # low <= column <= high (межі включно, як у сценарії 19-20 А)
+    def __init__(self, column, low, high):
+        self.column, self.low, self.high = column, low, high
+
+    @property
+    def columns(self):
+        return [self.column]
+
+    def expression(self):
+        return f"(({self.column} >= {_operand(self.low)}) & ({self.column} <= {_operand(self.high)}))"
+
+    def evaluate(self, data, start, stop, out, tmp):
+        values = data[self.column][start:stop]
+        np.greater_equal(values, self.low, out=out)
+        np.less_equal(values, self.high, out=tmp)
+        np.logical_and(out, tmp, out=out)
+
+class IsMax(Predicate):
+    # Значення колонки строго більше за кожну з інших колонок групи
+    def __init__(self, column, others):
+        self.column, self.others = column, list(others)
+
+    @property
+    def columns(self):
+        return [self.column] + self.others
+
+    def expression(self):
+        return "(" + " & ".join(f"({self.column} > {other})" for other in self.others) + ")"
+
+    def evaluate(self, data, start, stop, out, tmp):
+        values = data[self.column][start:stop]
+        out[...] = True
+        for other in self.others:
+            np.greater(values, data[other][start:stop], out=tmp)
+            np.logical_and(out, tmp, out=out)
+
+class All(Predicate):
+    def __init__(self, *predicates):
+        # Вкладені All розгортаються, щоб a & b & c обчислювались одним рівнем
+        self.predicates = []
+        for predicate in predicates:
+            self.predicates += predicate.predicates if isinstance(predicate, All) else [predicate]
+
+    @property
+    def columns(self):
+        return list(dict.fromkeys(name for p in self.predicates for name in p.columns))
+
+    def expression(self):
+        return "(" + " & ".join(p.expression() for p in self.predicates) + ")"
+
+    def evaluate(self, data, start, stop, out, tmp):
+        self.predicates[0].evaluate(data, start, stop, out, tmp)
+        part = np.empty_like(out)
+        for predicate in self.predicates[1:]:
+            # Якщо в шматку вже не лишилось жодного рядка, решту умов не рахуємо
+            if not out.any():
+                return
+            predicate.evaluate(data, start, stop, part, tmp)
+            np.logical_and(out, part, out=out)
+
+# --- Запит ---
+# Дані — будь-що з доступом data['колонка']: структурований масив, ColumnTable
+# або DataFrame. Результат — маска, індекси рядків або вже відібрані рядки.
+class Query:
+    def __init__(self, predicate, chunk_rows=CHUNK_ROWS, use_numexpr=True):
+        self.predicate = predicate
+        self.chunk_rows = chunk_rows
+        self.use_numexpr = use_numexpr and numexpr is not None
+
+    def mask(self, data):
+        columns = {name: np.asarray(data[name]) for name in self.predicate.columns}
+        if self.use_numexpr:
+            return numexpr.evaluate(self.predicate.expression(), local_dict=columns)
+
+        n = len(next(iter(columns.values())))
+        mask = np.empty(n, dtype=bool)
+        tmp = np.empty(min(self.chunk_rows, n), dtype=bool)
+        for start in range(0, n, self.chunk_rows):
+            stop = min(start + self.chunk_rows, n)
+            self.predicate.evaluate(columns, start, stop, mask[start:stop], tmp[:stop - start])
+        return mask
+
+    def indices(self, data):
+        return np.flatnonzero(self.mask(data))
+
+    def select(self, data):
+        # DataFrame відбирається за позиціями, масиви й ColumnTable — звичайною індексацією
+        indices = self.indices(data)
+        return data.iloc[indices] if hasattr(data, "iloc") else data[indices]
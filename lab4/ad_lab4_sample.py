@@ -0,0 +1,92 @@
+import numpy as np
+
+# --- Вибірки без повторень ---
+# Усі функції приймають np.random.Generator і повертають відсортовані індекси:
+# вибірка рядків за зростаючими адресами читає пам'ять послідовно, а не
+# стрибками, і для memmap підвантажує кожну сторінку лише раз.
+def default_rng(rng=None):
+    # Без явного генератора seed береться з глобального стану np.random,
+    # щоб np.random.seed(...) у бенчмарку й надалі робив прогін відтворюваним
+    return rng if rng is not None else np.random.default_rng(np.random.randint(2**31))
+
+def sample_indices(rng, n, k):
+    k = min(k, n)
+    # Generator.choice без повторень не переставляє весь діапазон: для малих k
+    # використовується алгоритм Флойда, для великих — часткове перемішування;
+    # shuffle=False прибирає зайве перемішування результату, який ми й так сортуємо
+    indices = rng.choice(n, size=k, replace=False, shuffle=False)
+    indices.sort()
+    return indices
+
+def sample_rows(data, k, rng=None):
+    return data[sample_indices(default_rng(rng), len(data), k)]
+
+def columns_mean(data, columns, indices):
+    # Збираємо лише потрібні колонки, а не цілі записи; np.asarray — щоб колонка
+    # DataFrame індексувалась за позицією, а не за мітками
+    return np.array([np.mean(np.asarray(data[name])[indices], dtype=np.float64) for name in columns])
+
+def sample_mean(data, columns, k, rng=None):
+    return columns_mean(data, columns, sample_indices(default_rng(rng), len(data), k))
+
+# --- Стратифікована вибірка ---
+# strata — мітка групи для кожного рядка (наприклад, година доби з time_buckets).
+# Розмір k розподіляється між групами пропорційно їх розміру (метод найбільших
+# залишків), а всередині групи рядки обираються випадково.
+def stratified_indices(rng, strata, k):
+    n = len(strata)
+    k = min(k, n)
+    labels, inverse, counts = np.unique(strata, return_inverse=True, return_counts=True)
+    quota = counts * k / n
+    sizes = np.floor(quota).astype(np.int64)
+    remainder = k - sizes.sum()
+    sizes[np.argsort(sizes - quota)[:remainder]] += 1
+
+    # Рядки групуються стабільним сортуванням міток (для малих цілих — radix sort),
+    # а всередині кожної групи вибірка береться тим самим sample_indices
+    order = np.argsort(inverse.astype(np.int16) if len(labels) < 2**15 else inverse, kind="stable")
+    bounds = np.r_[0, np.cumsum(counts)]
+    indices = np.concatenate([order[bounds[g] + sample_indices(rng, counts[g], sizes[g])]
+                              for g in range(len(labels))])
+    indices.sort()
+    return indices
+
+def stratified_mean(data, columns, strata, k, rng=None):
+    return columns_mean(data, columns, stratified_indices(default_rng(rng), strata, k))
+
+# --- Резервуарна вибірка з потоку ---
+# Алгоритм R, векторизований по шматках: елемент з глобальним номером i
+# потрапляє в резервуар з імовірністю k / (i + 1) і замінює випадкову позицію.
+# chunks — ітератор словників колонок (наприклад, iter_chunks з ad_lab4_store),
+# тож вибірку можна взяти з файлу, який не вміщується в пам'ять.
+def reservoir_sample(chunks, k, rng=None):
+    rng = default_rng(rng)
+    reservoir, positions, seen = None, np.empty(0, dtype=np.int64), 0
+    for chunk in chunks:
+        m = len(next(iter(chunk.values())))
+        index = np.arange(seen, seen + m)
+        if reservoir is None:
+            reservoir = {name: np.empty(0, dtype=values.dtype) for name, values in chunk.items()}
+
+        # Поки резервуар не заповнений, елементи додаються без відбору
+        fill = max(0, min(k - len(positions), m))
+        if fill:
+            reservoir = {name: np.concatenate([reservoir[name], values[:fill]]) for name, values in chunk.items()}
+            positions = np.concatenate([positions, index[:fill]])
+
+        accepted = fill + np.flatnonzero(rng.random(m - fill) * (index[fill:] + 1) < k)
+        if len(accepted):
+            slots = rng.integers(0, k, len(accepted))
+            # При повторних слотах має перемогти пізніший елемент потоку: залишаємо
+            # останнє входження кожного слота
+            _, last = np.unique(slots[::-1], return_index=True)
+            keep = len(slots) - 1 - last
+            for name, values in chunk.items():
+                reservoir[name][slots[keep]] = values[accepted[keep]]
+            positions[slots[keep]] = index[accepted[keep]]
+        seen += m
+
+    if reservoir is None:
+        return {}
+    order = np.argsort(positions)
+    return {name: values[order] for name, values in reservoir.items()}
@@ -0,0 +1,239 @@
+import os
+import json
+import time
+import argparse
+import tracemalloc
+import numpy as np
+import pandas as pd
+from ad_lab4_time import SECONDS_PER_DAY, parse_date_days, parse_time_seconds, resample, seconds_of_day, \
+    time_of_day_profile
+from ad_lab4_sample import reservoir_sample
+
+DATA_FILE = "household_power_consumption.txt"
+
+# --- Потокове завантаження ---
+# Файл читається шматками по CHUNK_ROWS рядків у типізовані колонки:
+# дата і час зливаються в один int64 Timestamp (секунди від епохи),
+# вимірювання зберігаються як float32. Умову відбору (where) можна
+# застосувати до кожного шматка одразу після розбору, тоді в пам'яті
+# тримається лише поточний шматок і вже відібрані рядки.
+CHUNK_ROWS = 250_000
+TIMESTAMP = "Timestamp"
+MEASUREMENTS = ["Global_active_power", "Global_reactive_power", "Voltage", "Global_intensity",
+                "Sub_metering_1", "Sub_metering_2", "Sub_metering_3"]
+COLUMNS = [TIMESTAMP] + MEASUREMENTS
+MEASURE_DTYPE = np.float32
+
+def iter_chunks(path=DATA_FILE, columns=None, where=None, chunk_rows=CHUNK_ROWS):
+    # where(chunk) -> булева маска над словником колонок шматка
+    columns = columns or COLUMNS
+    reader = pd.read_csv(path, sep=';', na_values=['?'], chunksize=chunk_rows,
+                         dtype={"Date": str, "Time": str, **{m: MEASURE_DTYPE for m in MEASUREMENTS}})
+    for frame in reader:
+        # Пропуски в оригіналі охоплюють увесь запис, як і в load_numpy
+        frame = frame[frame["Global_active_power"].notna()]
+        chunk = {m: frame[m].to_numpy() for m in MEASUREMENTS}
+        chunk[TIMESTAMP] = parse_date_days(frame["Date"].to_numpy()).astype(np.int64) * SECONDS_PER_DAY + \
+                           parse_time_seconds(frame["Time"].to_numpy())
+        if where is not None:
+            mask = where(chunk)
+            chunk = {name: values[mask] for name, values in chunk.items()}
+        yield {name: chunk[name] for name in columns}
+
+def load_columns(path=DATA_FILE, columns=None, where=None, chunk_rows=CHUNK_ROWS):
+    columns = columns or COLUMNS
+    chunks = list(iter_chunks(path, columns, where, chunk_rows))
+    if not chunks:
+        return {name: np.empty(0, dtype=np.int64 if name == TIMESTAMP else MEASURE_DTYPE) for name in columns}
+    return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in columns}
+
+def timestamps_to_datetime(values):
+    return values.astype("datetime64[s]")
+
+# --- Таблиця колонок ---
+# Той самий доступ, що й до структурованого масиву: table['Voltage'] — колонка,
+# table[['Voltage', 'Global_intensity']] — підмножина колонок, table[mask] /
+# table[indices] / table[:n] — рядки. Колонки зберігаються окремими масивами,
+# тож зрізи залишаються видами без копіювання.
+class ColumnTable:
+    def __init__(self, columns):
+        self.columns = dict(columns)
+
+    def __len__(self):
+        return len(next(iter(self.columns.values())))
+
+    @property
+    def names(self):
+        return list(self.columns)
+
+    @property
+    def nbytes(self):
+        return sum(values.nbytes for values in self.columns.values())
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.columns[key]
+        if isinstance(key, list) and key and isinstance(key[0], str):
+            return ColumnTable({name: self.columns[name] for name in key})
+        if isinstance(key, np.ndarray) and key.dtype == bool:
+            # Маску перетворюємо на індекси один раз, а не для кожної колонки
+            key = np.flatnonzero(key)
+        return ColumnTable({name: values[key] for name, values in self.columns.items()})
+
+    @classmethod
+    def concat(cls, tables):
+        names = tables[0].names
+        return cls({name: np.concatenate([table[name] for table in tables]) for name in names})
+
+# --- Структура масивів (SoA) ---
+# Замість структурованого масиву з полями U10/U8 (понад 100 байт на запис,
+# кожна колонка читається з кроком запису) кожне поле — окремий суцільний
+# масив компактного типу: Date — номер дня від епохи (int32), Time — секунди
+# від півночі (int32), вимірювання — float32. Це 36 байт на запис.
+DATE = "Date"
+TIME = "Time"
+
+def soa_from_columns(columns):
+    days, seconds = np.divmod(columns[TIMESTAMP], SECONDS_PER_DAY)
+    return ColumnTable({DATE: days.astype(np.int32), TIME: seconds.astype(np.int32),
+                        **{m: columns[m].astype(MEASURE_DTYPE, copy=False) for m in MEASUREMENTS}})
+
+def soa_from_records(records):
+    # Перетворення вже завантаженого структурованого масиву (load_numpy)
+    return ColumnTable({DATE: parse_date_days(records[DATE]), TIME: parse_time_seconds(records[TIME]),
+                        **{m: records[m].astype(MEASURE_DTYPE) for m in MEASUREMENTS}})
+
+def load_soa(path=DATA_FILE, where=None, chunk_rows=CHUNK_ROWS):
+    return soa_from_columns(load_columns(path, where=where, chunk_rows=chunk_rows))
+
+def days_to_datetime(values):
+    return values.astype("datetime64[D]")
+
+# --- Колонкове сховище на диску ---
+# Одноразова конвертація текстового файлу в окремі бінарні файли колонок
+# (<колонка>.bin) і meta.json з кількістю рядків, типами та розміром/mtime
+# джерела. Наступні запуски відкривають колонки через np.memmap: старт майже
+# миттєвий, сторінки підвантажуються ОС лише тоді, коли сценарій їх читає.
+STORE_META = "meta.json"
+
+def store_dir_for(path):
+    return os.path.splitext(path)[0] + "_columns"
+
+def source_signature(path):
+    stat = os.stat(path)
+    return {"path": os.path.abspath(path), "size": stat.st_size, "mtime": stat.st_mtime}
+
+def convert_to_store(path=DATA_FILE, store_dir=None, chunk_rows=CHUNK_ROWS):
+    store_dir = store_dir or store_dir_for(path)
+    os.makedirs(store_dir, exist_ok=True)
+    meta_path = os.path.join(store_dir, STORE_META)
+    if os.path.exists(meta_path):
+        os.remove(meta_path)
+
+    # Колонки дописуються по шматках, тож конвертація йде в обмеженій пам'яті
+    files = {name: open(os.path.join(store_dir, name + ".bin.part"), "wb") for name in COLUMNS}
+    rows = 0
+    try:
+        for chunk in iter_chunks(path, chunk_rows=chunk_rows):
+            for name, values in chunk.items():
+                values.tofile(files[name])
+            rows += len(chunk[TIMESTAMP])
+    finally:
+        for f in files.values():
+            f.close()
+    for name in COLUMNS:
+        os.replace(os.path.join(store_dir, name + ".bin.part"), os.path.join(store_dir, name + ".bin"))
+
+    # meta.json пишеться останнім: його наявність означає, що сховище повне
+    meta = {
+        "rows": rows,
+        "dtypes": {name: np.dtype(np.int64 if name == TIMESTAMP else MEASURE_DTYPE).str for name in COLUMNS},
+        "source": source_signature(path),
+    }
+    with open(meta_path, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    return meta
+
+def read_store_meta(store_dir):
+    try:
+        with open(os.path.join(store_dir, STORE_META), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def open_store(store_dir):
+    meta = read_store_meta(store_dir)
+    if meta is None:
+        raise FileNotFoundError(f"Колонкове сховище не знайдено: {store_dir}")
+    columns = {}
+    for name, dtype in meta["dtypes"].items():
+        if meta["rows"] == 0:
+            columns[name] = np.empty(0, dtype=dtype)
+            continue
+        values = np.memmap(os.path.join(store_dir, name + ".bin"), dtype=dtype, mode="r", shape=(meta["rows"],))
+        # Звичайний ndarray-вид над відображеною пам'яттю: результати операцій
+        # не успадковують клас memmap
+        columns[name] = values.view(np.ndarray)
+    return ColumnTable(columns)
+
+def ensure_store(path=DATA_FILE, store_dir=None):
+    # Перебудовуємо сховище лише якщо змінився розмір або час зміни джерела;
+    # повертає True, якщо конвертація відбулася
+    store_dir = store_dir or store_dir_for(path)
+    meta = read_store_meta(store_dir)
+    if meta is not None and {k: meta["source"].get(k) for k in ("size", "mtime")} == \
+            {k: v for k, v in source_signature(path).items() if k != "path"}:
+        return False
+    print(f"[INFO] Конвертація {path} у колонкове сховище {store_dir}...")
+    convert_to_store(path, store_dir)
+    return True
+
+def load_memmap(path=DATA_FILE, store_dir=None):
+    ensure_store(path, store_dir)
+    return open_store(store_dir or store_dir_for(path))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Потокове завантаження household_power_consumption.txt")
+    parser.add_argument("--data", default=DATA_FILE)
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    parser.add_argument("--min-power", type=float, default=5.0, help="умова Global_active_power > N")
+    parser.add_argument("--convert", action="store_true", help="лише (пере)створити колонкове сховище")
+    parser.add_argument("--sample", type=int, metavar="K",
+                        help="резервуарна вибірка K рядків прямо з потоку шматків, без завантаження файлу")
+    args = parser.parse_args()
+
+    if args.convert:
+        start = time.perf_counter()
+        meta = convert_to_store(args.data, chunk_rows=args.chunk_rows)
+        print(f"[OK] {meta['rows']} рядків збережено у {store_dir_for(args.data)} "
+              f"за {time.perf_counter() - start:.2f} сек")
+        raise SystemExit
+
+    if args.sample:
+        start = time.perf_counter()
+        sample = reservoir_sample(iter_chunks(args.data, chunk_rows=args.chunk_rows), args.sample,
+                                  np.random.default_rng(42))
+        means = ", ".join(f"{m} {sample[m].mean(dtype=np.float64):.3f}" for m in MEASUREMENTS[:4])
+        print(f"[OK] Вибірка {len(sample[TIMESTAMP])} рядків за {time.perf_counter() - start:.3f} сек: {means}")
+        raise SystemExit
+
+    for title, where in [("увесь файл", None),
+                         (f"Global_active_power > {args.min_power}",
+                          lambda chunk: chunk["Global_active_power"] > args.min_power)]:
+        start = time.perf_counter()
+        data = load_columns(args.data, where=where, chunk_rows=args.chunk_rows)
+        elapsed = time.perf_counter() - start
+        # Пікова пам'ять — окремим прогоном, бо tracemalloc сповільнює розбір рядків
+        del data
+        tracemalloc.start()
+        data = load_columns(args.data, where=where, chunk_rows=args.chunk_rows)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{title}: {len(data[TIMESTAMP])} рядків за {elapsed:.3f} сек, пік {peak / 2**20:.1f} МБ")
+
+        # Агрегування прямо з int64 Timestamp, без datetime-об'єктів на кожен рядок
+        days, daily = resample(data[TIMESTAMP], data["Global_active_power"], "day")
+        profile = time_of_day_profile(seconds_of_day(data[TIMESTAMP]), data["Global_active_power"])
+        if len(days):
+            print(f"  днів: {len(days)}, середня потужність по добах {daily.mean():.3f} кВт, "
+                  f"пікова година доби {np.nanargmax(profile)}:00 ({np.nanmax(profile):.3f} кВт)")
@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+# --- Час доби без об'єктів Python на кожен рядок ---
+# Рядки HH:MM:SS розбираються за один прохід: масив фіксованої ширини U8
+# переглядається як матриця кодів символів (n, 8), з якої цифри збираються
+# в секунди від півночі. Далі все працює з цілими масивами: маски діапазону
+# годин, номери інтервалів доби і агрегування по годинах/добах.
+SECONDS_PER_HOUR = 3600
+SECONDS_PER_DAY = 24 * SECONDS_PER_HOUR
+RESAMPLE_STEPS = {"hour": SECONDS_PER_HOUR, "day": SECONDS_PER_DAY}
+
+def parse_time_seconds(values):
+    codes = np.ascontiguousarray(np.asarray(values, dtype="U8")).view(np.uint32).reshape(-1, 8)
+    digits = codes[:, [0, 1, 3, 4, 6, 7]].astype(np.int32) - ord("0")
+    return (digits[:, 0] * 10 + digits[:, 1]) * SECONDS_PER_HOUR + \
+           (digits[:, 2] * 10 + digits[:, 3]) * 60 + digits[:, 4] * 10 + digits[:, 5]
+
+def parse_date_days(values):
+    # Дата d/m/yyyy має змінну ширину, але різних дат мало (одна на 1440 записів),
+    # тому перетворюємо лише унікальні значення
+    codes, uniques = pd.factorize(np.asarray(values))
+    days = pd.to_datetime(uniques, format="%d/%m/%Y").to_numpy("datetime64[D]").astype(np.int32)
+    return days[codes]
+
+def seconds_of_day(timestamps):
+    return (timestamps % SECONDS_PER_DAY).astype(np.int32)
+
+def hour_mask(seconds, start_hour, end_hour=24):
+    # [start_hour, end_hour); якщо start_hour > end_hour — діапазон через північ (22 → 6)
+    start, end = start_hour * SECONDS_PER_HOUR, end_hour * SECONDS_PER_HOUR
+    if start <= end:
+        return (seconds >= start) & (seconds < end)
+    return (seconds >= start) | (seconds < end)
+
+def time_buckets(seconds, bucket_seconds=SECONDS_PER_HOUR):
+    return seconds // bucket_seconds
+
+def time_of_day_profile(seconds, values, bucket_seconds=SECONDS_PER_HOUR):
+    # Середнє значення для кожного інтервалу доби (за замовчуванням — 24 години)
+    buckets = time_buckets(seconds, bucket_seconds)
+    size = SECONDS_PER_DAY // bucket_seconds
+    sums = np.bincount(buckets, weights=values, minlength=size)
+    counts = np.bincount(buckets, minlength=size)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts
+
+def resample(timestamps, values, freq="hour"):
+    # Мітки часу відсортовані (записи похвилинні), тож межі груп знаходяться
+    # одним проходом, а суми — через np.add.reduceat
+    step = RESAMPLE_STEPS[freq]
+    if len(timestamps) == 0:
+        # Напр., відбір по шматках, якому не відповідає жоден рядок
+        return np.empty(0, dtype="datetime64[s]"), np.empty(0)
+    keys = timestamps // step
+    if np.any(keys[1:] < keys[:-1]):
+        raise ValueError("resample: мітки часу мають бути відсортовані за зростанням")
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    sums = np.add.reduceat(values.astype(np.float64), starts)
+    counts = np.diff(np.r_[starts, len(keys)])
+    return (keys[starts] * step).astype("datetime64[s]"), sums / counts
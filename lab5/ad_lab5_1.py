@@ -1,7 +1,8 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from functools import lru_cache
 from matplotlib.widgets import Slider, Button, CheckButtons
-from scipy.signal import butter, filtfilt
+from scipy.signal import butter, sosfiltfilt
 
 # ---------------------------
 # Функція для генерації гармоніки з шумом
@@ -16,11 +17,19 @@ def harmonic_with_noise(t, amplitude, frequency, phase, noise_mean, noise_covari
 # ---------------------------
 # Фільтр Butterworth
 # ---------------------------
-def apply_filter(data, cutoff, fs=100, order=5):
-    nyq = 0.5 * fs
-    normal_cutoff = cutoff / nyq
-    b, a = butter(order, normal_cutoff, btype='low', analog=False)
-    return filtfilt(b, a, data)
+# Проєкт фільтра кешується за (тип, порядок, зріз, fs): при зміні амплітуди чи фази
+# butter() не викликається повторно. Фільтр зберігається як секції другого порядку
+# (SOS) — вони стійкіші за форму (b, a) при високих порядках і низьких зрізах.
+FILTER_CACHE_SIZE = 64
+
+@lru_cache(maxsize=FILTER_CACHE_SIZE)
+def design_filter(btype, order, cutoff, fs):
+    return butter(order, cutoff, btype=btype, fs=fs, output='sos')
+
+def apply_filter(data, cutoff, fs=100, order=5, btype='low'):
+    # data — один сигнал або 2-D масив сигналів по рядках: усі фільтруються одним викликом
+    sos = design_filter(btype, order, float(cutoff), float(fs))
+    return sosfiltfilt(sos, data, axis=-1)
 
 # ---------------------------
 # Початкові параметри
@@ -36,8 +45,9 @@ init_cutoff = 2.0
 t = np.linspace(0, 10, 1000)
 fs = len(t) / (t[-1] - t[0])
 
-# Зберігаємо фіксований шум
+# Зберігаємо фіксований шум; версія змінюється щоразу, коли шум генерується заново
 current_noise = np.random.normal(init_noise_mean, np.sqrt(init_noise_covariance), size=len(t))
+noise_version = 0
 
 # Початкові сигнали
 y_clean, y_noisy, _ = harmonic_with_noise(t, init_amplitude, init_frequency, init_phase, init_noise_mean, init_noise_covariance, noise=current_noise)
@@ -87,11 +97,18 @@ button = Button(reset_ax, 'Reset')
 prev_noise_mean = init_noise_mean
 prev_noise_cov = init_noise_covariance
 
+# ---------------------------
+# Кеш обчислень для update(): чекбокси лише змінюють видимість ліній,
+# тому сигнал і фільтр перераховуються тільки коли змінились їх параметри
+# ---------------------------
+signal_key = None
+filter_key = None
+
 # ---------------------------
 # Функція оновлення
 # ---------------------------
 def update(val):
-    global current_noise, prev_noise_mean, prev_noise_cov
+    global current_noise, prev_noise_mean, prev_noise_cov, noise_version, signal_key, filter_key
 
     amplitude = amp_slider.val
     frequency = freq_slider.val
@@ -107,16 +124,22 @@ def update(val):
         current_noise = np.random.normal(noise_mean, np.sqrt(noise_cov), size=len(t))
         prev_noise_mean = noise_mean
         prev_noise_cov = noise_cov
+        noise_version += 1
 
-    y_clean = amplitude * np.sin(2 * np.pi * frequency * t + phase)
-    y_noisy = y_clean + current_noise
-    y_filtered = apply_filter(y_noisy, cutoff=cutoff, fs=fs) if apply_filter_flag else y_noisy
+    new_signal_key = (amplitude, frequency, phase, noise_version)
+    if new_signal_key != signal_key:
+        y_clean = amplitude * np.sin(2 * np.pi * frequency * t + phase)
+        y_noisy = y_clean + current_noise
+        line_clean.set_ydata(y_clean)
+        line_noisy.set_ydata(y_noisy)
+        signal_key = new_signal_key
 
-    line_clean.set_ydata(y_clean)
-    line_noisy.set_ydata(y_noisy)
-    line_noisy.set_visible(show_noise)
+    # Фільтруємо лише увімкнений фільтр і лише якщо змінився сигнал або зріз
+    if apply_filter_flag and (signal_key, cutoff) != filter_key:
+        line_filtered.set_ydata(apply_filter(line_noisy.get_ydata(), cutoff=cutoff, fs=fs))
+        filter_key = (signal_key, cutoff)
 
-    line_filtered.set_ydata(y_filtered)
+    line_noisy.set_visible(show_noise)
     line_filtered.set_visible(apply_filter_flag)
 
     fig.canvas.draw_idle()
@@ -125,7 +148,7 @@ def update(val):
 # Reset
 # ---------------------------
 def reset(event=None):
-    global current_noise, prev_noise_mean, prev_noise_cov
+    global current_noise, prev_noise_mean, prev_noise_cov, noise_version
     amp_slider.reset()
     freq_slider.reset()
     phase_slider.reset()
@@ -139,6 +162,7 @@ def reset(event=None):
     prev_noise_mean = init_noise_mean
     prev_noise_cov = init_noise_covariance
     current_noise = np.random.normal(prev_noise_mean, np.sqrt(prev_noise_cov), size=len(t))
+    noise_version += 1
     update(None)
 
 # ---------------------------
@@ -0,0 +1,196 @@
+import time
+import argparse
+from collections import deque
+import numpy as np
+from scipy.signal import butter, sosfilt, sosfilt_zi
+
+# ---------------------------
+# Потоковий режим: гармоніка з шумом генерується блоками, а фільтр Butterworth
+# (секції другого порядку, sosfilt) застосовується причинно — стан фільтра zi
+# переноситься з блоку в блок, тож результат збігається з фільтрацією всього
+# сигналу одразу, а потік може бути нескінченним.
+# ---------------------------
+DEFAULT_FS = 1000.0      # Гц
+DEFAULT_BLOCK = 32       # відліків у блоці (~1 кадр при 1 кГц і 30 fps)
+DEFAULT_WINDOW = 5.0     # секунд на екрані
+DEFAULT_FPS = 30
+
+# ---------------------------
+# Джерело сигналу
+# ---------------------------
+class HarmonicStream:
+    def __init__(self, fs, amplitude=1.0, frequency=1.0, phase=0.0, noise_mean=0.0, noise_covariance=0.1, seed=None):
+        self.fs = fs
+        self.amplitude, self.frequency, self.phase = amplitude, frequency, phase
+        self.noise_mean, self.noise_covariance = noise_mean, noise_covariance
+        self.rng = np.random.default_rng(seed)
+        self.position = 0  # номер наступного відліку
+
+    def next_block(self, size):
+        t = (self.position + np.arange(size)) / self.fs
+        self.position += size
+        y_clean = self.amplitude * np.sin(2 * np.pi * self.frequency * t + self.phase)
+        noise = self.rng.normal(self.noise_mean, np.sqrt(self.noise_covariance), size=size)
+        return t, y_clean, y_clean + noise
+
+# ---------------------------
+# Причинний фільтр зі збереженням стану
+# ---------------------------
+class StreamingFilter:
+    def __init__(self, cutoff, fs, order=5, btype='low'):
+        self.sos = butter(order, cutoff, btype=btype, fs=fs, output='sos')
+        self.zi = None
+
+    def process(self, block):
+        if self.zi is None:
+            # Початковий стан — усталений відгук на перший відлік, без перехідного процесу з нуля
+            self.zi = sosfilt_zi(self.sos) * block[0]
+        filtered, self.zi = sosfilt(self.sos, block, zi=self.zi)
+        return filtered
+
+# ---------------------------
+# Буфер для прокручуваного графіка
+# ---------------------------
+class ScrollBuffer:
+    def __init__(self, size, channels=3):
+        self.data = np.full((channels, size), np.nan)
+
+    def push(self, *columns):
+        n = len(columns[0])
+        if n >= self.data.shape[1]:
+            self.data[:] = [c[-self.data.shape[1]:] for c in columns]
+            return
+        self.data[:, :-n] = self.data[:, n:]
+        self.data[:, -n:] = columns
+
+# ---------------------------
+# Заміри затримки на блок
+# ---------------------------
+class LatencyStats:
+    # Потік нескінченний, тому середнє рахується накопичувально,
+    # а p99 і максимум — по останніх RECENT_BLOCKS блоках
+    RECENT_BLOCKS = 1000
+
+    def __init__(self):
+        self.recent = deque(maxlen=self.RECENT_BLOCKS)
+        self.blocks = 0
+        self.total = 0.0
+
+    def add(self, seconds):
+        self.recent.append(seconds)
+        self.blocks += 1
+        self.total += seconds
+
+    def summary(self, block_duration):
+        recent = np.array(self.recent)
+        mean = self.total / self.blocks
+        return {
+            "blocks": self.blocks,
+            "mean_ms": mean * 1000,
+            "p99_ms": np.percentile(recent, 99) * 1000,
+            "max_ms": recent.max() * 1000,
+            # У скільки разів обробка швидша за надходження даних (> 1 — встигаємо)
+            "realtime_factor": block_duration / mean,
+        }
+
+def process_block(stream, stream_filter, block_size, stats):
+    start = time.perf_counter()
+    t, y_clean, y_noisy = stream.next_block(block_size)
+    y_filtered = stream_filter.process(y_noisy)
+    stats.add(time.perf_counter() - start)
+    return t, y_clean, y_noisy, y_filtered
+
+def print_summary(stats, fs, block_size):
+    s = stats.summary(block_size / fs)
+    print(f"Блоків: {s['blocks']}, затримка на блок: середня {s['mean_ms']:.3f} мс, p99 {s['p99_ms']:.3f} мс, "
+          f"макс {s['max_ms']:.3f} мс; запас реального часу x{s['realtime_factor']:.1f} "
+          f"(fs = {fs:g} Гц, блок {block_size} відліків = {block_size / fs * 1000:.1f} мс)")
+
+# ---------------------------
+# Без GUI: перевірка, чи встигає фільтр на заданій частоті дискретизації
+# ---------------------------
+def run_benchmark(args):
+    stream = HarmonicStream(args.fs, args.amplitude, args.frequency, noise_covariance=args.noise_covariance, seed=42)
+    stream_filter = StreamingFilter(args.cutoff, args.fs, args.order)
+    stats = LatencyStats()
+    blocks = max(1, int(args.bench * args.fs / args.block))
+    noisy, filtered = [], []
+    for _ in range(blocks):
+        _, _, y_noisy, y_filtered = process_block(stream, stream_filter, args.block, stats)
+        noisy.append(y_noisy)
+        filtered.append(y_filtered)
+    print_summary(stats, args.fs, args.block)
+
+    # Поблокова фільтрація має дати той самий результат, що й один виклик на всьому сигналі
+    noisy = np.concatenate(noisy)
+    reference, _ = sosfilt(stream_filter.sos, noisy, zi=sosfilt_zi(stream_filter.sos) * noisy[0])
+    print(f"Розбіжність із фільтрацією всього сигналу: {np.abs(np.concatenate(filtered) - reference).max():.2e}")
+
+# ---------------------------
+# GUI: прокручуваний графік зі сталою частотою кадрів
+# ---------------------------
+def run_live(args):
+    import matplotlib.pyplot as plt
+    from matplotlib.animation import FuncAnimation
+
+    stream = HarmonicStream(args.fs, args.amplitude, args.frequency, noise_covariance=args.noise_covariance)
+    stream_filter = StreamingFilter(args.cutoff, args.fs, args.order)
+    stats = LatencyStats()
+    window = int(args.window * args.fs)
+    buffer = ScrollBuffer(window)
+    x = np.arange(-window, 0) / args.fs
+
+    fig, ax = plt.subplots()
+    line_clean, = ax.plot(x, buffer.data[0], label='Clean Signal', color='blue')
+    line_noisy, = ax.plot(x, buffer.data[1], label='Noisy Signal', color='orange', alpha=0.5)
+    line_filtered, = ax.plot(x, buffer.data[2], label='Filtered Signal (sosfilt)', color='green')
+    limit = args.amplitude + 3 * np.sqrt(args.noise_covariance)
+    ax.set_xlim(x[0], 0)
+    ax.set_ylim(-limit, limit)
+    ax.set_xlabel('Time, s (0 — зараз)')
+    ax.set_ylabel('Amplitude')
+    ax.legend(loc='upper right')
+    status = ax.text(0.01, 0.02, '', transform=ax.transAxes, fontsize=8)
+
+    started = time.perf_counter()
+
+    def frame(_):
+        # Скільки відліків мало надійти від старту — стільки блоків і обробляємо
+        due = int((time.perf_counter() - started) * args.fs)
+        while stream.position + args.block <= due:
+            _, y_clean, y_noisy, y_filtered = process_block(stream, stream_filter, args.block, stats)
+            buffer.push(y_clean, y_noisy, y_filtered)
+        line_clean.set_ydata(buffer.data[0])
+        line_noisy.set_ydata(buffer.data[1])
+        line_filtered.set_ydata(buffer.data[2])
+        if stats.blocks:
+            s = stats.summary(args.block / args.fs)
+            status.set_text(f"fs {args.fs:g} Гц, блок {args.block}: {s['mean_ms']:.3f} мс/блок "
+                            f"(p99 {s['p99_ms']:.3f}), x{s['realtime_factor']:.0f}, "
+                            f"відставання {due - stream.position} відліків")
+        return line_clean, line_noisy, line_filtered, status
+
+    animation = FuncAnimation(fig, frame, interval=1000 / args.fps, blit=True, cache_frame_data=False)
+    plt.show()
+    if stats.blocks:
+        print_summary(stats, args.fs, args.block)
+    return animation
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Потокова фільтрація гармоніки з шумом")
+    parser.add_argument("--fs", type=float, default=DEFAULT_FS, help="частота дискретизації, Гц")
+    parser.add_argument("--block", type=int, default=DEFAULT_BLOCK, help="відліків у блоці")
+    parser.add_argument("--cutoff", type=float, default=2.0, help="частота зрізу, Гц")
+    parser.add_argument("--order", type=int, default=5)
+    parser.add_argument("--amplitude", type=float, default=1.0)
+    parser.add_argument("--frequency", type=float, default=1.0)
+    parser.add_argument("--noise-covariance", type=float, default=0.1)
+    parser.add_argument("--window", type=float, default=DEFAULT_WINDOW, help="секунд на графіку")
+    parser.add_argument("--fps", type=int, default=DEFAULT_FPS)
+    parser.add_argument("--bench", type=float, help="без GUI: обробити стільки секунд сигналу і вивести затримки")
+    args = parser.parse_args()
+
+    if args.bench:
+        run_benchmark(args)
+    else:
+        run_live(args)